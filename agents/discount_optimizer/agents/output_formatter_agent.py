@@ -11,6 +11,7 @@ This module implements the OutputFormatter as a proper Google ADK agent with:
 Requirements: 2.1, 2.3, 3.1, 3.3
 """
 
+import json
 from decimal import Decimal
 from typing import Any
 
@@ -18,14 +19,65 @@ from google import genai
 from google.genai import types
 from pydantic import BaseModel, Field
 
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None  # type: ignore
+
 from agents.discount_optimizer.config import settings
 from agents.discount_optimizer.domain.models import Purchase, ShoppingRecommendation
+from agents.discount_optimizer.domain.protocols import CacheRepository
+from agents.discount_optimizer.infrastructure.cache_repository import (
+    deserialize_from_cache,
+    generate_cache_key,
+    serialize_for_cache,
+)
 from agents.discount_optimizer.logging import get_logger, set_agent_context
 
 
 # Get logger for this module
 logger = get_logger(__name__)
 
+# Bump whenever FormattingOutput or the models it nests change shape; cached
+# entries written under another version are treated as misses.
+FORMATTING_OUTPUT_SCHEMA_VERSION = 1
+
+
+def _loads_json(text: str) -> Any:
+    """
+    Decode a JSON document, using orjson when it is installed.
+
+    orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers handle
+    decode failures the same way with either backend.
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def _extract_json_object(text: str) -> str:
+    """
+    Slice the outermost JSON object out of a model response.
+
+    Gemini sometimes wraps its JSON in markdown fences or adds a sentence around
+    it. A single find/rfind pair locates the object without peeling fences one
+    prefix at a time. Text without an object is returned unchanged so that the
+    decoder reports the failure.
+    """
+    # Happy path: the model returned bare JSON, so there is nothing to scan for
+    if text[:1] == "{" and text[-1:] == "}":
+        return text
+
+    start = text.find("{")
+    end = text.rfind("}")
+    if start == -1 or end < start:
+        return text
+    return text[start : end + 1]
+
 
 class FormattingInput(BaseModel):
     """
@@ -125,12 +177,20 @@ class OutputFormatterAgent:
     Requirements: 2.1, 2.3, 3.1, 3.3
     """
 
-    def __init__(self, api_key: str | None = None):
+    def __init__(
+        self,
+        api_key: str | None = None,
+        cache_repository: CacheRepository | None = None,
+        cache_ttl_seconds: int | None = None,
+    ):
         """
         Initialize OutputFormatter agent with Google ADK.
 
         Args:
             api_key: Optional Google API key. If None, uses settings.google_api_key
+            cache_repository: Optional cache for Gemini-formatted outputs, keyed by input
+            cache_ttl_seconds: TTL for cached outputs. If None, uses settings.cache_ttl_seconds;
+                0 or less disables caching
 
         Raises:
             ValueError: If API key is not provided and not in settings
@@ -149,11 +209,17 @@ class OutputFormatterAgent:
         self.client = genai.Client(api_key=api_key)
         self.model = f"models/{settings.agent_model}"
 
+        self.cache_repository = cache_repository
+        self.cache_ttl_seconds = (
+            settings.cache_ttl_seconds if cache_ttl_seconds is None else cache_ttl_seconds
+        )
+
         logger.info(
             "output_formatter_agent_initialized",
             model=settings.agent_model,
             temperature=settings.agent_temperature,
             max_tokens=settings.agent_max_tokens,
+            has_cache=cache_repository is not None,
         )
 
     async def run(self, input_data: FormattingInput) -> FormattingOutput:
@@ -185,6 +251,13 @@ class OutputFormatterAgent:
             has_user_context=bool(input_data.user_context),
         )
 
+        # Identical inputs get the previously generated tips and motivation
+        cache_key = self._generate_cache_key(input_data)
+        cached_output = await self._get_from_cache(cache_key)
+        if cached_output is not None:
+            logger.info("output_formatting_cache_hit", cache_key=cache_key)
+            return cached_output
+
         try:
             # Format output using Gemini
             output = await self.format_output(input_data)
@@ -195,6 +268,9 @@ class OutputFormatterAgent:
                 motivation_length=len(output.motivation_message),
             )
 
+            # Only Gemini output is cached; fallbacks are cheap to regenerate
+            await self._save_to_cache(cache_key, output)
+
             return output
 
         except Exception as e:
@@ -254,6 +330,73 @@ class OutputFormatterAgent:
             logger.exception("gemini_api_call_failed", error=str(e), error_type=type(e).__name__)
             raise
 
+    def _generate_cache_key(self, input_data: FormattingInput) -> str:
+        """Generate cache key for an output formatting request."""
+        return generate_cache_key(input_data.model_dump_json(), prefix="output_format:")
+
+    async def _get_from_cache(self, cache_key: str) -> FormattingOutput | None:
+        """
+        Get formatted output from cache.
+
+        Entries are our own trusted output, so the model is restored as pickled
+        without re-running Pydantic validation; the schema version guards
+        against entries written by an older FormattingOutput.
+        """
+        if (
+            not settings.enable_caching
+            or self.cache_repository is None
+            or self.cache_ttl_seconds <= 0
+        ):
+            return None
+
+        try:
+            cached_data = await self.cache_repository.get(cache_key)
+            if cached_data is None:
+                return None
+
+            cached_blob = deserialize_from_cache(cached_data)
+            if (
+                not isinstance(cached_blob, dict)
+                or cached_blob.get("_v") != FORMATTING_OUTPUT_SCHEMA_VERSION
+            ):
+                logger.debug("stale_cache_entry", cache_key=cache_key)
+                return None
+
+            cached_result = cached_blob.get("output")
+            if isinstance(cached_result, FormattingOutput):
+                return cached_result
+
+            logger.warning(
+                "invalid_cache_data_type",
+                expected="FormattingOutput",
+                actual=type(cached_result).__name__,
+            )
+            return None
+        except Exception as e:
+            logger.warning("cache_retrieval_failed", error=str(e), error_type=type(e).__name__)
+            return None
+
+    async def _save_to_cache(self, cache_key: str, output: FormattingOutput) -> None:
+        """Save formatted output to cache."""
+        if (
+            not settings.enable_caching
+            or self.cache_repository is None
+            or self.cache_ttl_seconds <= 0
+        ):
+            return
+
+        try:
+            await self.cache_repository.set(
+                cache_key,
+                serialize_for_cache({"_v": FORMATTING_OUTPUT_SCHEMA_VERSION, "output": output}),
+                ttl_seconds=self.cache_ttl_seconds,
+            )
+            logger.debug(
+                "formatted_output_cached", cache_key=cache_key, ttl_seconds=self.cache_ttl_seconds
+            )
+        except Exception as e:
+            logger.warning("cache_save_failed", error=str(e), error_type=type(e).__name__)
+
     def _create_prompt(self, input_data: FormattingInput) -> str:
         """
         Create optimized prompt for Gemini output formatting.
@@ -419,24 +562,12 @@ Your motivation messages should:
         Returns:
             Structured FormattingOutput
         """
-        import json
-
         # Try to parse as JSON
         try:
-            # Remove markdown code blocks if present
-            cleaned_text = response_text.strip()
-            if cleaned_text.startswith("```json"):
-                cleaned_text = cleaned_text[7:]
-            if cleaned_text.startswith("```"):
-                cleaned_text = cleaned_text[3:]
-            if cleaned_text.endswith("```"):
-                cleaned_text = cleaned_text[:-3]
-            cleaned_text = cleaned_text.strip()
-
-            # Parse JSON
-            data = json.loads(cleaned_text)
-
-            # Extract tips and motivation
+            # Drop markdown fences or surrounding prose, then parse JSON
+            data = _loads_json(_extract_json_object(response_text))
+
+            # Only tips and motivation are used; ignore any other fields
             tips = data.get("tips", [])
             motivation_message = data.get("motivation_message", "")
 
@@ -100,6 +100,16 @@ class Settings(BaseSettings):
         default=30, gt=0, le=300, description="Timeout for external API calls (seconds)"
     )
 
+    api_connect_timeout_seconds: float = Field(
+        default=2.0,
+        gt=0,
+        le=300,
+        description=(
+            "Timeout for establishing a connection to the Salling Group API (seconds); "
+            "capped at api_timeout_seconds"
+        ),
+    )
+
     # =========================================================================
     # Cache Configuration (Redis)
     # =========================================================================
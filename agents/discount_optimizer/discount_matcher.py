@@ -9,6 +9,31 @@ from .models import MOCK_DISCOUNTS, DiscountItem, Location, Timeframe
 from .salling_api_client import SallingAPIClient
 
 
+# Earth's radius in kilometers
+EARTH_RADIUS_KM = 6371.0
+
+
+def _haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    Great-circle distance in kilometers between two points given in degrees.
+
+    Takes plain floats so it can be called without a DiscountMatcher instance
+    or Location objects.
+    """
+    # Convert latitude and longitude from degrees to radians
+    lat1_rad = math.radians(lat1)
+    lat2_rad = math.radians(lat2)
+
+    # Haversine formula
+    dlat = lat2_rad - lat1_rad
+    dlon = math.radians(lon2 - lon1)
+
+    a = math.sin(dlat / 2) ** 2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon / 2) ** 2
+    # 2*asin(sqrt(a)) equals 2*atan2(sqrt(a), sqrt(1 - a)) for a in [0, 1]
+    # with one square root fewer; min() guards against rounding above 1.
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(a, 1.0)))
+
+
 class DiscountMatcher:
     """
     Responsible for loading and filtering discount data based on location and timeframe.
@@ -95,26 +120,7 @@ class DiscountMatcher:
         Returns:
             Distance in kilometers
         """
-        # Earth's radius in kilometers
-        R = 6371.0
-
-        # Convert latitude and longitude from degrees to radians
-        lat1_rad = math.radians(loc1.latitude)
-        lon1_rad = math.radians(loc1.longitude)
-        lat2_rad = math.radians(loc2.latitude)
-        lon2_rad = math.radians(loc2.longitude)
-
-        # Haversine formula
-        dlat = lat2_rad - lat1_rad
-        dlon = lon2_rad - lon1_rad
-
-        a = (
-            math.sin(dlat / 2) ** 2
-            + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon / 2) ** 2
-        )
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-
-        return R * c
+        return _haversine_km(loc1.latitude, loc1.longitude, loc2.latitude, loc2.longitude)
 
     def filter_by_location(
         self, discounts: list[DiscountItem], user_location: Location, max_distance_km: float = 20.0
@@ -130,11 +136,31 @@ class DiscountMatcher:
         Returns:
             List of discounts within the specified radius
         """
-        filtered = []
+        # Same Haversine test as calculate_distance, but with the user's trig
+        # terms hoisted out of the loop and the inverse step folded into a
+        # single threshold: distance <= d  <=>  a <= sin^2(d / 2R). This drops
+        # the per-item atan2/sqrt calls and the second pair of radians() calls.
+        if max_distance_km < 0:
+            return []
+        if max_distance_km >= math.pi * EARTH_RADIUS_KM:
+            return list(discounts)
+
+        lat1_rad = math.radians(user_location.latitude)
+        lon1_rad = math.radians(user_location.longitude)
+        cos_lat1 = math.cos(lat1_rad)
+        max_a = math.sin(max_distance_km / (2 * EARTH_RADIUS_KM)) ** 2
+
+        radians = math.radians
+        sin = math.sin
+        cos = math.cos
 
+        filtered = []
         for discount in discounts:
-            distance = self.calculate_distance(user_location, discount.store_location)
-            if distance <= max_distance_km:
+            lat2_rad = radians(discount.store_location.latitude)
+            dlat = lat2_rad - lat1_rad
+            dlon = radians(discount.store_location.longitude) - lon1_rad
+            a = sin(dlat / 2) ** 2 + cos_lat1 * cos(lat2_rad) * sin(dlon / 2) ** 2
+            if a <= max_a:
                 filtered.append(discount)
 
         return filtered
@@ -152,11 +178,6 @@ class DiscountMatcher:
         Returns:
             List of discounts that are valid within the timeframe
         """
-        filtered = []
-
-        for discount in discounts:
-            # Include discount if expiration date is >= timeframe start date
-            if discount.expiration_date >= timeframe.start_date:
-                filtered.append(discount)
-
-        return filtered
+        # Include discount if expiration date is >= timeframe start date
+        start_date = timeframe.start_date
+        return [discount for discount in discounts if discount.expiration_date >= start_date]
@@ -117,6 +117,8 @@ class DiscountItem(BaseModel):
         ... )
     """
 
+    model_config = ConfigDict(frozen=True)
+
     product_name: str = Field(min_length=1, max_length=200, description="Name of the product")
     store_name: str = Field(min_length=1, max_length=100, description="Name of the store")
     store_location: Location = Field(description="Geographic location of the store")
@@ -315,7 +315,10 @@ class AgentFactory:
         """
         if self._output_formatter is None:
             api_key = self._api_key or self.config.google_api_key.get_secret_value()
-            self._output_formatter = OutputFormatterAgent(api_key=api_key)
+            cache_repository = self.get_cache_repository() if self.config.enable_caching else None
+            self._output_formatter = OutputFormatterAgent(
+                api_key=api_key, cache_repository=cache_repository
+            )
             logger.debug("created_output_formatter_agent")
 
         return self._output_formatter
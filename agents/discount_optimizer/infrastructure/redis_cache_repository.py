@@ -113,8 +113,9 @@ class RedisCacheRepository:
     - Graceful degradation on connection failures
     - TTL support for cache expiration
 
-    The cache uses pickle for serialization, allowing storage of any
-    Python object. Redis provides persistence and multi-instance support.
+    Values are stored as opaque bytes and written to Redis unchanged; callers
+    choose the encoding (see ``serialize_for_cache``). Redis provides
+    persistence and multi-instance support.
 
     Example:
         >>> cache = RedisCacheRepository(host="localhost", port=6379, db=0)
@@ -361,6 +362,10 @@ class RedisCacheRepository:
         This method removes all cached data with the key prefix.
         Use with caution in production environments.
 
+        Matching keys are queued as UNLINK commands on a non-transactional
+        pipeline while SCAN walks the keyspace, so the deletes cost a single
+        round-trip and Redis reclaims memory in the background.
+
         Example:
             >>> await cache.clear()
         """
@@ -368,18 +373,19 @@ class RedisCacheRepository:
             # Use SCAN to find all keys with our prefix
             pattern = f"{self.key_prefix}*"
             cursor = 0
-            deleted_count = 0
+            pipe = self._client.pipeline(transaction=False)
 
             while True:
-                cursor, keys = await self._client.scan(cursor=cursor, match=pattern, count=100)
+                cursor, keys = await self._client.scan(cursor=cursor, match=pattern, count=1000)
 
                 if keys:
-                    deleted = await self._client.delete(*keys)
-                    deleted_count += deleted
+                    pipe.unlink(*keys)
 
                 if cursor == 0:
                     break
 
+            deleted_count = sum(await pipe.execute())
+
             logger.info(
                 "redis_cache_cleared",
                 entries_removed=deleted_count,
@@ -5,8 +5,12 @@ providing type-safe, async access to discount data with automatic retries,
 connection pooling, and comprehensive error handling.
 """
 
+import json
+import time
+from collections import OrderedDict
 from datetime import date, datetime, timedelta
 from decimal import Decimal
+from functools import lru_cache
 from typing import Any
 
 import httpx
@@ -27,6 +31,62 @@ from agents.discount_optimizer.metrics import get_metrics_collector
 logger = structlog.get_logger(__name__)
 metrics_collector = get_metrics_collector()
 
+# HTTP/2 lets concurrent fetches multiplex over one pooled connection; httpx only
+# negotiates it when the optional ``h2`` package (httpx[http2]) is installed.
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# ciso8601 parses the offer endTime timestamps in C; Python 3.11's
+# datetime.fromisoformat accepts the same "...Z" strings as a fallback.
+try:
+    from ciso8601 import parse_datetime
+
+    CISO8601_AVAILABLE = True
+except ImportError:
+    CISO8601_AVAILABLE = False
+    parse_datetime = datetime.fromisoformat
+
+# orjson decodes the large food-waste payloads several times faster than the
+# stdlib parser and reads the body bytes directly.
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None  # type: ignore
+
+# Danish/English keywords marking a product as organic in its description.
+ORGANIC_KEYWORDS = ("økologisk", "organic", "øko", "bio")
+
+
+# Parsed responses are reused for identical (geo, radius) queries within this
+# window, so preference tweaks during one user session skip the network.
+RESPONSE_CACHE_TTL_SECONDS = 300.0
+RESPONSE_CACHE_MAXSIZE = 128
+
+
+def _loads_json(content: bytes) -> Any:
+    """Decode a response body, using orjson when it is installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+@lru_cache(maxsize=8192, typed=True)
+def _decimal_cached(value: float) -> Decimal:
+    """Convert an API price to Decimal, reusing instances for repeated prices.
+
+    Grocery prices repeat heavily across a response (19.95, 25.00, ...), so
+    most lookups hit the cache instead of re-parsing the string. Decimal is
+    immutable, which makes sharing instances between items safe.
+    """
+    return Decimal(str(value))
+
 
 class SallingDiscountRepository:
     """Repository for Salling Group API with connection pooling and retry logic.
@@ -35,6 +95,7 @@ class SallingDiscountRepository:
     async access to discount data from the Salling Group API. It includes:
     - Automatic retry with exponential backoff
     - HTTP connection pooling for performance
+    - Short-lived in-process cache of parsed responses
     - Comprehensive error handling
     - Pydantic validation of API responses
     - Context manager support for resource cleanup
@@ -60,12 +121,15 @@ class SallingDiscountRepository:
         self,
         api_key: str | None = None,
         client: httpx.AsyncClient | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
     ):
         """Initialize the Salling API repository.
 
         Args:
             api_key: Salling Group API key (defaults to settings.salling_group_api_key)
             client: Optional pre-configured httpx.AsyncClient for testing
+            transport: Optional transport for the repository-owned client, e.g. an
+                aiohttp-backed transport from httpx-aiohttp. Ignored when client is given.
 
         Raises:
             ValueError: If no API key is provided and none is configured
@@ -82,9 +146,15 @@ class SallingDiscountRepository:
             )
 
         # Use provided client or create new one with connection pooling
+        self._transport = transport
         self._client = client or self._create_client()
         self._owns_client = client is None  # Track if we created the client
 
+        # LRU of parsed responses keyed by (lat, lon, capped radius)
+        self._response_cache: OrderedDict[
+            tuple[float, float, float], tuple[float, list[DiscountItem]]
+        ] = OrderedDict()
+
         logger.info(
             "salling_repository_initialized",
             base_url=self.BASE_URL,
@@ -95,14 +165,25 @@ class SallingDiscountRepository:
     def _create_client(self) -> httpx.AsyncClient:
         """Create a new httpx.AsyncClient with connection pooling.
 
+        The client lives as long as the repository, so every fetch_discounts
+        call reuses pooled keep-alive connections instead of paying a fresh
+        TCP+TLS handshake. HTTP/2 is enabled when ``h2`` is installed. When a
+        custom transport was injected, it owns pooling and protocol choice and
+        httpx ignores the http2/limits arguments.
+
         Returns:
             Configured AsyncClient instance
         """
         return httpx.AsyncClient(
-            timeout=settings.api_timeout_seconds,
+            http2=HTTP2_AVAILABLE,
+            timeout=httpx.Timeout(
+                settings.api_timeout_seconds,
+                # A dead host fails fast, but never later than the overall timeout
+                connect=min(settings.api_connect_timeout_seconds, settings.api_timeout_seconds),
+            ),
             limits=httpx.Limits(
                 max_connections=settings.max_concurrent_requests,
-                max_keepalive_connections=5,
+                max_keepalive_connections=settings.max_concurrent_requests,
                 keepalive_expiry=30.0,
             ),
             headers={
@@ -110,6 +191,7 @@ class SallingDiscountRepository:
                 "User-Agent": "ShoppingOptimizer/1.0",
             },
             follow_redirects=True,
+            transport=self._transport,
         )
 
     @retry(
@@ -130,7 +212,8 @@ class SallingDiscountRepository:
 
         This method fetches food waste offers from the Salling Group API within
         the specified radius of the given location. It automatically retries
-        failed requests with exponential backoff.
+        failed requests with exponential backoff. Parsed results are reused for
+        identical location/radius queries for RESPONSE_CACHE_TTL_SECONDS.
 
         Args:
             location: Geographic location to search around
@@ -154,12 +237,21 @@ class SallingDiscountRepository:
             radius_km=radius_km,
         )
 
+        # Cap radius at API maximum
+        radius_km_capped = min(radius_km, 100.0)
+        cache_key = (
+            round(location.latitude, 4),
+            round(location.longitude, 4),
+            radius_km_capped,
+        )
+        cached = self._get_cached_response(cache_key)
+        if cached is not None:
+            logger.debug("discounts_cache_hit", count=len(cached), radius_km=radius_km_capped)
+            return cached
+
         try:
             # Track API call timing and success
             with metrics_collector.time_api_call("salling", "/food-waste"):
-                # Cap radius at API maximum
-                radius_km_capped = min(radius_km, 100.0)
-
                 # Build request parameters
                 # Salling API expects geo parameter in format "latitude,longitude"
                 params: dict[str, str | float] = {
@@ -202,14 +294,16 @@ class SallingDiscountRepository:
 
                 response.raise_for_status()
 
-                # Parse JSON response
-                json_data = response.json()
+                # Decode straight from the raw body bytes; response.json() would
+                # first build an intermediate str of the whole payload
+                json_data = _loads_json(response.content)
 
                 # Parse and validate discount items
                 discounts = self._parse_response(json_data)
 
                 # Record successful API call
                 metrics_collector.record_api_success("salling", "/food-waste")
+                self._save_cached_response(cache_key, discounts)
 
                 logger.info(
                     "discounts_fetched",
@@ -249,6 +343,32 @@ class SallingDiscountRepository:
             logger.exception("unexpected_error", error=str(e), error_type=type(e).__name__)
             raise APIError(f"Unexpected error fetching discounts: {e!s}") from e
 
+    def _get_cached_response(self, key: tuple[float, float, float]) -> list[DiscountItem] | None:
+        """Return a copy of a fresh cached response, or None on miss/expiry."""
+        entry = self._response_cache.get(key)
+        if entry is None:
+            return None
+
+        expires_at, discounts = entry
+        if time.monotonic() >= expires_at:
+            del self._response_cache[key]
+            return None
+
+        self._response_cache.move_to_end(key)
+        return list(discounts)
+
+    def _save_cached_response(
+        self, key: tuple[float, float, float], discounts: list[DiscountItem]
+    ) -> None:
+        """Store a parsed response, evicting the least recently used entry."""
+        self._response_cache[key] = (
+            time.monotonic() + RESPONSE_CACHE_TTL_SECONDS,
+            list(discounts),
+        )
+        self._response_cache.move_to_end(key)
+        if len(self._response_cache) > RESPONSE_CACHE_MAXSIZE:
+            self._response_cache.popitem(last=False)
+
     async def health_check(self) -> bool:
         """Check if the Salling API is healthy and accessible.
 
@@ -365,6 +485,11 @@ class SallingDiscountRepository:
                     longitude=coordinates[0],
                 )
 
+                # Store-level fields are identical for every clearance at this
+                # store, so build them once rather than per item
+                store_display_name = f"{store_name} {store_city}".strip()
+                store_address = f"{store_street}, {store_city}".strip(", ")
+
                 # Process each clearance item at this store
                 clearances = store_data.get("clearances", [])
 
@@ -373,9 +498,9 @@ class SallingDiscountRepository:
                         discount_item = self._parse_discount(
                             clearance=clearance,
                             store_name=store_name,
+                            store_display_name=store_display_name,
                             store_location=store_location,
-                            store_street=store_street,
-                            store_city=store_city,
+                            store_address=store_address,
                         )
                         discount_items.append(discount_item)
 
@@ -400,18 +525,18 @@ class SallingDiscountRepository:
         self,
         clearance: dict[str, Any],
         store_name: str,
+        store_display_name: str,
         store_location: Location,
-        store_street: str,
-        store_city: str,
+        store_address: str,
     ) -> DiscountItem:
         """Parse a single clearance item into a DiscountItem with Pydantic validation.
 
         Args:
             clearance: Clearance data from API
-            store_name: Name of the store
+            store_name: Name of the store (used for logging)
+            store_display_name: Store name qualified with its city
             store_location: Location of the store
-            store_street: Street address of the store
-            store_city: City of the store
+            store_address: Full "street, city" address of the store
 
         Returns:
             Validated DiscountItem object
@@ -435,33 +560,28 @@ class SallingDiscountRepository:
 
         if end_time_str:
             # Parse ISO format datetime
-            end_time = datetime.fromisoformat(end_time_str.replace("Z", "+00:00"))
-            expiration_date = end_time.date()
+            expiration_date = parse_datetime(end_time_str).date()
         else:
             # Default to 3 days from now if no expiration
             expiration_date = date.today() + timedelta(days=3)
 
         # Determine if product is organic
         # Check for Danish organic keywords in product name
-        is_organic = any(
-            keyword in product_name.lower() for keyword in ["økologisk", "organic", "øko", "bio"]
-        )
-
-        # Create full store address
-        full_address = f"{store_street}, {store_city}".strip(", ")
+        product_name_lower = product_name.lower()
+        is_organic = any(keyword in product_name_lower for keyword in ORGANIC_KEYWORDS)
 
         # Create and validate DiscountItem using Pydantic
         try:
             return DiscountItem(
                 product_name=product_name,
-                store_name=f"{store_name} {store_city}".strip(),
+                store_name=store_display_name,
                 store_location=store_location,
-                original_price=Decimal(str(original_price)),
-                discount_price=Decimal(str(discount_price)),
+                original_price=_decimal_cached(original_price),
+                discount_price=_decimal_cached(discount_price),
                 discount_percent=float(discount_percent),
                 expiration_date=expiration_date,
                 is_organic=is_organic,
-                store_address=full_address,
+                store_address=store_address,
                 travel_distance_km=0.0,  # Will be calculated later by Google Maps
                 travel_time_minutes=0.0,  # Will be calculated later by Google Maps
             )
@@ -4,6 +4,7 @@ Validates and sanitizes user inputs according to requirements.
 """
 
 from datetime import UTC, date, datetime, timedelta
+from functools import lru_cache
 from typing import Any
 
 from .google_maps_service import GoogleMapsService
@@ -15,6 +16,51 @@ def get_today() -> date:
     return datetime.now(UTC).date()
 
 
+@lru_cache(maxsize=64)
+def _parse_timeframe_cached(timeframe: str, today: date) -> tuple[date, date]:
+    """
+    Resolve a timeframe phrase to a (start_date, end_date) pair for ``today``.
+
+    Keyed on the date so cached ranges roll over at midnight; returns plain
+    dates so every caller still gets its own Timeframe.
+    """
+    timeframe_lower = timeframe.lower().strip()
+
+    if timeframe_lower in ["this week", "denna vecka"]:
+        # Start from today, end 7 days from now
+        start_date = today
+        end_date = today + timedelta(days=7)
+    elif timeframe_lower in ["next week", "nästa vecka"]:
+        # Start from next Monday, end 7 days later
+        days_until_monday = (7 - today.weekday()) % 7
+        if days_until_monday == 0:
+            days_until_monday = 7
+        start_date = today + timedelta(days=days_until_monday)
+        end_date = start_date + timedelta(days=7)
+    elif "next" in timeframe_lower and "days" in timeframe_lower:
+        # Parse "next X days"
+        try:
+            parts = timeframe_lower.split()
+            days_index = parts.index("next") + 1
+            num_days = int(parts[days_index])
+            start_date = today
+            end_date = today + timedelta(days=num_days)
+        except (ValueError, IndexError):
+            raise ValueError(f"Cannot parse timeframe: {timeframe}")
+    elif timeframe_lower in ["today", "idag"]:
+        start_date = today
+        end_date = today
+    elif timeframe_lower in ["tomorrow", "imorgon"]:
+        start_date = today + timedelta(days=1)
+        end_date = today + timedelta(days=1)
+    else:
+        # Default to this week if format not recognized
+        start_date = today
+        end_date = today + timedelta(days=7)
+
+    return start_date, end_date
+
+
 class ValidationError(Exception):
     """Custom exception for validation errors."""
 
@@ -189,41 +235,7 @@ class InputValidator:
         Raises:
             ValueError: If timeframe format is not recognized
         """
-        today = get_today()
-        timeframe_lower = timeframe.lower().strip()
-
-        if timeframe_lower in ["this week", "denna vecka"]:
-            # Start from today, end 7 days from now
-            start_date = today
-            end_date = today + timedelta(days=7)
-        elif timeframe_lower in ["next week", "nästa vecka"]:
-            # Start from next Monday, end 7 days later
-            days_until_monday = (7 - today.weekday()) % 7
-            if days_until_monday == 0:
-                days_until_monday = 7
-            start_date = today + timedelta(days=days_until_monday)
-            end_date = start_date + timedelta(days=7)
-        elif "next" in timeframe_lower and "days" in timeframe_lower:
-            # Parse "next X days"
-            try:
-                parts = timeframe_lower.split()
-                days_index = parts.index("next") + 1
-                num_days = int(parts[days_index])
-                start_date = today
-                end_date = today + timedelta(days=num_days)
-            except (ValueError, IndexError):
-                raise ValueError(f"Cannot parse timeframe: {timeframe}")
-        elif timeframe_lower in ["today", "idag"]:
-            start_date = today
-            end_date = today
-        elif timeframe_lower in ["tomorrow", "imorgon"]:
-            start_date = today + timedelta(days=1)
-            end_date = today + timedelta(days=1)
-        else:
-            # Default to this week if format not recognized
-            start_date = today
-            end_date = today + timedelta(days=7)
-
+        start_date, end_date = _parse_timeframe_cached(timeframe, get_today())
         return Timeframe(start_date=start_date, end_date=end_date)
 
     def _validate_preferences(self, preferences_data: dict[str, Any]) -> OptimizationPreferences:
@@ -6,7 +6,7 @@ from dataclasses import dataclass
 from datetime import date, timedelta
 
 
-@dataclass
+@dataclass(slots=True)
 class Location:
     """Represents a geographic location with coordinates."""
 
@@ -14,7 +14,7 @@ class Location:
     longitude: float
 
 
-@dataclass
+@dataclass(slots=True)
 class Timeframe:
     """Represents a time period for shopping."""
 
@@ -22,7 +22,7 @@ class Timeframe:
     end_date: date
 
 
-@dataclass
+@dataclass(slots=True)
 class OptimizationPreferences:
     """User preferences for optimization criteria."""
 
@@ -31,7 +31,7 @@ class OptimizationPreferences:
     prefer_organic: bool
 
 
-@dataclass
+@dataclass(slots=True)
 class UserInput:
     """Complete user input for shopping optimization."""
 
@@ -41,7 +41,7 @@ class UserInput:
     timeframe: Timeframe
 
 
-@dataclass
+@dataclass(slots=True)
 class DiscountItem:
     """Represents a discounted product at a specific store."""
 
@@ -58,7 +58,7 @@ class DiscountItem:
     travel_time_minutes: float = 0.0
 
 
-@dataclass
+@dataclass(slots=True)
 class Purchase:
     """Represents a recommended purchase."""
 
@@ -70,7 +70,7 @@ class Purchase:
     meal_association: str
 
 
-@dataclass
+@dataclass(slots=True)
 class ShoppingRecommendation:
     """Complete shopping recommendation output."""
 
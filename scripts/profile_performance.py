@@ -34,9 +34,13 @@ from agents.discount_optimizer.infrastructure.cache_repository import (
     deserialize_from_cache,
     serialize_for_cache,
 )
+from agents.discount_optimizer.logging import get_logger
 from agents.discount_optimizer.metrics import get_metrics_collector, profile_operation
 
 
+logger = get_logger(__name__)
+
+
 # =============================================================================
 # Workload Definitions
 # =============================================================================
@@ -475,9 +479,7 @@ async def run_profiling(workload_name: str = "medium"):
 
     except Exception as e:
         print(f"\n❌ Profiling failed: {e}")
-        import traceback
-
-        traceback.print_exc()
+        logger.exception("profiling_failed", workload=workload_name, error_type=type(e).__name__)
 
 
 # =============================================================================
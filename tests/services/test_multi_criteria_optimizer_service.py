@@ -212,6 +212,32 @@ def test_optimize_maximize_savings(basic_optimization_input: OptimizationInput):
     assert output.total_savings == Decimal("15.00")
 
 
+def test_optimize_very_high_discount(user_location: Location, discount_item_high_savings: dict):
+    """Test that a 90% discount yields the full price difference as savings."""
+    service = MultiCriteriaOptimizerService()
+    item = {
+        **discount_item_high_savings,
+        "original_price": 100.00,
+        "discount_price": 10.00,  # 90% off
+        "discount_percent": 90.0,
+    }
+
+    output = service.optimize(
+        OptimizationInput(
+            ingredient_matches={"milk": [item]},
+            preferences=OptimizationPreferences(maximize_savings=True),
+            user_location=user_location,
+            timeframe_start=date.today(),
+            timeframe_end=date.today() + timedelta(days=7),
+        )
+    )
+
+    assert len(output.purchases) == 1
+    assert output.purchases[0].price == Decimal("10.00")
+    assert output.purchases[0].savings == Decimal("90.00")
+    assert output.total_savings == Decimal("90.00")
+
+
 # ============================================================================
 # Test: Scoring Algorithm - Minimize Stores
 # ============================================================================
@@ -282,15 +282,14 @@ def test_product_match_validation():
 
 @pytest.mark.asyncio
 async def test_map_ingredients_parses_valid_json(
-    monkeypatch, basic_input: IngredientMappingInput, mock_gemini_json_response: str
+    monkeypatch,
+    basic_input: IngredientMappingInput,
+    mock_gemini_json_response: str,
+    fake_gemini_response,
 ):
     """Test that agent correctly parses valid JSON response from Gemini."""
     # Mock the Gemini API response
-    mock_response = MagicMock()
-    mock_response.text = mock_gemini_json_response
-    mock_response.candidates = [MagicMock()]
-    mock_response.candidates[0].content.parts = [MagicMock()]
-    mock_response.candidates[0].content.parts[0].text = mock_gemini_json_response
+    mock_response = fake_gemini_response(mock_gemini_json_response)
 
     # Patch the client's generate_content method
     agent = IngredientMapperAgent(api_key="test_key")
@@ -328,15 +327,14 @@ async def test_map_ingredients_parses_valid_json(
 
 @pytest.mark.asyncio
 async def test_map_ingredients_partial_matches(
-    monkeypatch, basic_input: IngredientMappingInput, mock_gemini_partial_response: str
+    monkeypatch,
+    basic_input: IngredientMappingInput,
+    mock_gemini_partial_response: str,
+    fake_gemini_response,
 ):
     """Test handling of partial matches (some ingredients unmapped)."""
     # Mock the Gemini API response
-    mock_response = MagicMock()
-    mock_response.text = mock_gemini_partial_response
-    mock_response.candidates = [MagicMock()]
-    mock_response.candidates[0].content.parts = [MagicMock()]
-    mock_response.candidates[0].content.parts[0].text = mock_gemini_partial_response
+    mock_response = fake_gemini_response(mock_gemini_partial_response)
 
     # Patch the client's generate_content method
     agent = IngredientMapperAgent(api_key="test_key")
@@ -388,15 +386,14 @@ async def test_fallback_on_api_error(monkeypatch, basic_input: IngredientMapping
 
 @pytest.mark.asyncio
 async def test_prompt_includes_all_ingredients(
-    monkeypatch, basic_input: IngredientMappingInput, mock_gemini_json_response: str
+    monkeypatch,
+    basic_input: IngredientMappingInput,
+    mock_gemini_json_response: str,
+    fake_gemini_response,
 ):
     """Test that prompt includes all ingredients and products."""
     # Mock the Gemini API response
-    mock_response = MagicMock()
-    mock_response.text = mock_gemini_json_response
-    mock_response.candidates = [MagicMock()]
-    mock_response.candidates[0].content.parts = [MagicMock()]
-    mock_response.candidates[0].content.parts[0].text = mock_gemini_json_response
+    mock_response = fake_gemini_response(mock_gemini_json_response)
 
     # Capture the prompt
     captured_prompt = {}
@@ -452,7 +449,9 @@ def test_system_instruction_content():
 
 
 @pytest.mark.asyncio
-async def test_coverage_calculation_full(monkeypatch, mock_gemini_json_response: str):
+async def test_coverage_calculation_full(
+    monkeypatch, mock_gemini_json_response: str, fake_gemini_response
+):
     """Test coverage calculation when all ingredients match."""
     agent = IngredientMapperAgent(api_key="test_key")
 
@@ -496,11 +495,7 @@ async def test_coverage_calculation_full(monkeypatch, mock_gemini_json_response:
         ]
     }"""
 
-    mock_response = MagicMock()
-    mock_response.text = mock_response_text
-    mock_response.candidates = [MagicMock()]
-    mock_response.candidates[0].content.parts = [MagicMock()]
-    mock_response.candidates[0].content.parts[0].text = mock_response_text
+    mock_response = fake_gemini_response(mock_response_text)
 
     monkeypatch.setattr(agent.client.models, "generate_content", lambda **kwargs: mock_response)
 
@@ -517,7 +512,9 @@ async def test_coverage_calculation_full(monkeypatch, mock_gemini_json_response:
 
 
 @pytest.mark.asyncio
-async def test_multi_language_mapping(monkeypatch, mock_gemini_json_response: str):
+async def test_multi_language_mapping(
+    monkeypatch, mock_gemini_json_response: str, fake_gemini_response
+):
     """Test that Gemini can map English ingredients to Danish products."""
     agent = IngredientMapperAgent(api_key="test_key")
 
@@ -567,11 +564,7 @@ async def test_multi_language_mapping(monkeypatch, mock_gemini_json_response: st
         ]
     }"""
 
-    mock_response = MagicMock()
-    mock_response.text = mock_response_text
-    mock_response.candidates = [MagicMock()]
-    mock_response.candidates[0].content.parts = [MagicMock()]
-    mock_response.candidates[0].content.parts[0].text = mock_response_text
+    mock_response = fake_gemini_response(mock_response_text)
 
     monkeypatch.setattr(agent.client.models, "generate_content", lambda **kwargs: mock_response)
 
@@ -596,15 +589,14 @@ async def test_multi_language_mapping(monkeypatch, mock_gemini_json_response: st
 
 @pytest.mark.asyncio
 async def test_run_method_success(
-    monkeypatch, basic_input: IngredientMappingInput, mock_gemini_json_response: str
+    monkeypatch,
+    basic_input: IngredientMappingInput,
+    mock_gemini_json_response: str,
+    fake_gemini_response,
 ):
     """Test the run method executes successfully."""
     # Mock the Gemini API response
-    mock_response = MagicMock()
-    mock_response.text = mock_gemini_json_response
-    mock_response.candidates = [MagicMock()]
-    mock_response.candidates[0].content.parts = [MagicMock()]
-    mock_response.candidates[0].content.parts[0].text = mock_gemini_json_response
+    mock_response = fake_gemini_response(mock_gemini_json_response)
 
     agent = IngredientMapperAgent(api_key="test_key")
     monkeypatch.setattr(agent.client.models, "generate_content", lambda **kwargs: mock_response)
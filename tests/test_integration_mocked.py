@@ -12,238 +12,248 @@ which has been refactored into services. These tests need to be updated to use
 the new ShoppingOptimizerAgent.
 """
 
-import sys
+import functools
+import logging
+import os
 from datetime import date, datetime, timedelta
-from unittest.mock import Mock, patch
+from types import SimpleNamespace
+from typing import Any, NoReturn
 
 import pytest
 
+from agents.discount_optimizer import discount_matcher, meal_suggester
+
 # from agents.discount_optimizer.agent import optimize_shopping
 from agents.discount_optimizer.models import DiscountItem, Location
 from agents.discount_optimizer.salling_api_client import SallingAPIClient
 
 
-pytestmark = pytest.mark.skip(reason="Legacy test - needs update for new architecture")
+# The clock is frozen so the mock expiration dates below are fixed literals
+FROZEN_TODAY = "2025-01-15"
+
+pytestmark = [
+    pytest.mark.skip(reason="Legacy test - needs update for new architecture"),
+    pytest.mark.freeze_time(FROZEN_TODAY),
+]
+
+# Diagnostics are emitted at DEBUG; run with --log-level=DEBUG to see them
+log = logging.getLogger(__name__)
+
+
+# Shared store attributes for the mock discount specs
+_NETTO_TEST: dict[str, Any] = {
+    "store_name": "Netto Test",
+    "store_location": (55.6872, 12.5537),
+    "store_address": "Test Street 1",
+    "travel_distance_km": 1.5,
+    "travel_time_minutes": 8.0,
+}
+_FOETEX_TEST: dict[str, Any] = {
+    "store_name": "Føtex Test",
+    "store_location": (55.6692, 12.5515),
+    "store_address": "Test Street 2",
+    "travel_distance_km": 1.2,
+    "travel_time_minutes": 6.0,
+}
+
+# Mock discount data for testing, relative to FROZEN_TODAY
+_DISCOUNT_SPECS: tuple[dict[str, Any], ...] = (
+    {
+        **_NETTO_TEST,
+        "product_name": "Hakket oksekød",
+        "original_price": 65.0,
+        "discount_price": 49.0,
+        "discount_percent": 25.0,
+        "expiration_date": date(2025, 1, 18),
+        "is_organic": False,
+    },
+    {
+        **_FOETEX_TEST,
+        "product_name": "Tomater",
+        "original_price": 25.0,
+        "discount_price": 18.0,
+        "discount_percent": 28.0,
+        "expiration_date": date(2025, 1, 17),
+        "is_organic": True,
+    },
+    {
+        **_FOETEX_TEST,
+        "product_name": "Pasta",
+        "original_price": 18.0,
+        "discount_price": 12.0,
+        "discount_percent": 33.0,
+        "expiration_date": date(2025, 1, 29),
+        "is_organic": False,
+    },
+    {
+        **_NETTO_TEST,
+        "product_name": "Tortillas",
+        "original_price": 25.0,
+        "discount_price": 18.0,
+        "discount_percent": 28.0,
+        "expiration_date": date(2025, 1, 16),  # Expires tomorrow
+        "is_organic": False,
+    },
+    {
+        **_NETTO_TEST,
+        "product_name": "Ost",
+        "original_price": 45.0,
+        "discount_price": 35.0,
+        "discount_percent": 22.0,
+        "expiration_date": date(2025, 1, 22),
+        "is_organic": False,
+    },
+)
+
+_HIGH_DISCOUNT_SPECS: tuple[dict[str, Any], ...] = (
+    {
+        **_NETTO_TEST,
+        "product_name": "Hakket oksekød",
+        "original_price": 100.0,
+        "discount_price": 10.0,
+        "discount_percent": 90.0,  # 90% discount
+        "expiration_date": date(2025, 1, 15),  # Expires today
+        "is_organic": False,
+    },
+)
+
+
+@functools.cache
+def _build_discount(spec: tuple[tuple[str, Any], ...]) -> DiscountItem:
+    """Build a DiscountItem from a frozen spec, once per spec per session."""
+    fields = dict(spec)
+    latitude, longitude = fields.pop("store_location")
+    return DiscountItem(**fields, store_location=Location(latitude, longitude))
 
 
-# Mock discount data for testing
 def create_mock_discounts() -> list[DiscountItem]:
     """Create mock discount data for testing."""
-    return [
-        DiscountItem(
-            product_name="Hakket oksekød",
-            store_name="Netto Test",
-            store_location=Location(55.6872, 12.5537),
-            original_price=65.0,
-            discount_price=49.0,
-            discount_percent=25.0,
-            expiration_date=date.today() + timedelta(days=3),
-            is_organic=False,
-            store_address="Test Street 1",
-            travel_distance_km=1.5,
-            travel_time_minutes=8.0,
-        ),
-        DiscountItem(
-            product_name="Tomater",
-            store_name="Føtex Test",
-            store_location=Location(55.6692, 12.5515),
-            original_price=25.0,
-            discount_price=18.0,
-            discount_percent=28.0,
-            expiration_date=date.today() + timedelta(days=2),
-            is_organic=True,
-            store_address="Test Street 2",
-            travel_distance_km=1.2,
-            travel_time_minutes=6.0,
-        ),
-        DiscountItem(
-            product_name="Pasta",
-            store_name="Føtex Test",
-            store_location=Location(55.6692, 12.5515),
-            original_price=18.0,
-            discount_price=12.0,
-            discount_percent=33.0,
-            expiration_date=date.today() + timedelta(days=14),
-            is_organic=False,
-            store_address="Test Street 2",
-            travel_distance_km=1.2,
-            travel_time_minutes=6.0,
-        ),
-        DiscountItem(
-            product_name="Tortillas",
-            store_name="Netto Test",
-            store_location=Location(55.6872, 12.5537),
-            original_price=25.0,
-            discount_price=18.0,
-            discount_percent=28.0,
-            expiration_date=date.today() + timedelta(days=1),  # Expires tomorrow
-            is_organic=False,
-            store_address="Test Street 1",
-            travel_distance_km=1.5,
-            travel_time_minutes=8.0,
-        ),
-        DiscountItem(
-            product_name="Ost",
-            store_name="Netto Test",
-            store_location=Location(55.6872, 12.5537),
-            original_price=45.0,
-            discount_price=35.0,
-            discount_percent=22.0,
-            expiration_date=date.today() + timedelta(days=7),
-            is_organic=False,
-            store_address="Test Street 1",
-            travel_distance_km=1.5,
-            travel_time_minutes=8.0,
-        ),
-    ]
+    return [_build_discount(tuple(spec.items())) for spec in _DISCOUNT_SPECS]
 
 
 def create_high_discount_mock_data() -> list[DiscountItem]:
     """Create mock data with very high discounts for edge case testing."""
-    return [
-        DiscountItem(
-            product_name="Hakket oksekød",
-            store_name="Netto Test",
-            store_location=Location(55.6872, 12.5537),
-            original_price=100.0,
-            discount_price=10.0,
-            discount_percent=90.0,  # 90% discount
-            expiration_date=date.today(),  # Expires today
-            is_organic=False,
-            store_address="Test Street 1",
-            travel_distance_km=1.5,
-            travel_time_minutes=8.0,
-        ),
-    ]
+    return [_build_discount(tuple(spec.items())) for spec in _HIGH_DISCOUNT_SPECS]
 
 
-class TestIntegrationWithMockedAPIs:
-    """Integration tests with mocked Salling and Gemini APIs."""
+@pytest.fixture(scope="session")
+def _session_salling_client() -> SallingAPIClient:
+    """Single SallingAPIClient shared by every test in the session."""
+    return SallingAPIClient(api_key="test_key")
 
-    @staticmethod
-    def test_complete_workflow_with_mocked_apis():
-        """
-        Test complete workflow with mocked Salling and Gemini APIs.
-        Requirements: All requirements
-        """
-        print("\n=== Test 1: Complete Workflow with Mocked APIs ===")
 
-        mock_discounts = create_mock_discounts()
+@pytest.fixture
+def salling_client(_session_salling_client: SallingAPIClient) -> SallingAPIClient:
+    """Shared SallingAPIClient with its cache cleared before each test."""
+    _session_salling_client.clear_cache()
+    return _session_salling_client
 
-        # Mock Salling API
-        with patch("agents.discount_optimizer.discount_matcher.SallingAPIClient") as mock_salling:
-            mock_client = Mock()
-            mock_client.fetch_campaigns.return_value = mock_discounts
-            mock_salling.return_value = mock_client
-
-            # Mock Gemini API (MealSuggester)
-            with patch("agents.discount_optimizer.meal_suggester.genai") as mock_genai:
-                mock_model = Mock()
-                mock_response = Mock()
-                mock_response.text = "1. Pasta Bolognese\n2. Taco Night\n3. Cheese Platter"
-                mock_model.generate_content.return_value = mock_response
-                mock_genai.GenerativeModel.return_value = mock_model
-
-                result = optimize_shopping(
-                    latitude=55.6761,
-                    longitude=12.5683,
-                    meal_plan=["taco", "pasta"],
-                    timeframe="this week",
-                    maximize_savings=True,
-                    minimize_stores=True,
-                    prefer_organic=False,
-                )
-
-                assert result["success"], f"Optimization failed: {result.get('error')}"
-                assert "recommendation" in result
-                assert result["total_savings"] > 0
-                assert result["num_purchases"] > 0
-
-                print("✓ Test passed!")
-                print(f"  - Total savings: {result['total_savings']:.2f} DKK")
-                print(f"  - Number of purchases: {result['num_purchases']}")
 
-    @staticmethod
-    def test_salling_api_failure():
-        """
-        Test error handling when Salling API fails.
-        Requirements: 2.6, 11.2
-        """
-        print("\n=== Test 2: Salling API Failure ===")
-
-        # Mock Salling API to raise an exception
-        with patch("agents.discount_optimizer.discount_matcher.SallingAPIClient") as mock_salling:
-            mock_client = Mock()
-            mock_client.fetch_campaigns.side_effect = Exception("API connection failed")
-            mock_salling.return_value = mock_client
-
-            result = optimize_shopping(
-                latitude=55.6761,
-                longitude=12.5683,
-                meal_plan=["taco"],
-                timeframe="this week",
-                maximize_savings=True,
-                minimize_stores=False,
-                prefer_organic=False,
-            )
+@pytest.fixture
+def recorded_api_keys(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Use real API keys when recording cassettes and placeholders when replaying them."""
+    for name in ("SALLING_GROUP_API_KEY", "GOOGLE_API_KEY"):
+        monkeypatch.setenv(name, os.environ.get(name, "test_key"))
 
-            assert not result["success"], "Expected failure when API fails"
-            assert "error" in result
-            assert (
-                "matching discounts" in result["error"].lower()
-                or "error" in result["error"].lower()
-            )
 
-            print("✓ Test passed!")
-            print(f"  - Error message: {result['error']}")
+@pytest.fixture
+def mock_discounts() -> list[DiscountItem]:
+    """Mock discount data for testing."""
+    return create_mock_discounts()
+
+
+class _StubSallingClient:
+    """Lightweight stand-in for SallingAPIClient returning canned campaigns."""
+
+    def __init__(
+        self, items: list[DiscountItem] | None = None, error: Exception | None = None
+    ) -> None:
+        self.items = items if items is not None else []
+        self.error = error
+
+    def fetch_campaigns(self, *args: Any, **kwargs: Any) -> list[DiscountItem]:
+        if self.error is not None:
+            raise self.error
+        return self.items
+
+    def get_cached_campaigns(self) -> list[DiscountItem] | None:
+        return None
+
+
+def _unavailable_gemini_model(*args: Any, **kwargs: Any) -> NoReturn:
+    raise Exception("Gemini API unavailable")
+
+
+@pytest.fixture
+def stub_salling_client(monkeypatch: pytest.MonkeyPatch) -> _StubSallingClient:
+    """Route DiscountMatcher's SallingAPIClient to a stub the test can configure."""
+    stub = _StubSallingClient()
+    monkeypatch.setattr(discount_matcher, "SallingAPIClient", lambda *args, **kwargs: stub)
+    return stub
+
+
+class TestIntegrationWithMockedAPIs:
+    """Integration tests with mocked Salling and Gemini APIs."""
 
     @staticmethod
-    def test_no_products_available():
+    @pytest.mark.vcr
+    @pytest.mark.usefixtures("recorded_api_keys")
+    def test_complete_workflow_with_mocked_apis():
         """
-        Test error handling when no products are available.
-        Requirements: 2.6, 11.2
+        Test complete workflow with Salling and Gemini responses replayed from a cassette.
+        Requirements: All requirements
         """
-        print("\n=== Test 3: No Products Available ===")
-
-        # Mock Salling API to return empty list and no cache
-        with patch("agents.discount_optimizer.discount_matcher.SallingAPIClient") as mock_salling:
-            mock_client = Mock()
-            mock_client.fetch_campaigns.return_value = []
-            mock_client.get_cached_campaigns.return_value = None
-            mock_salling.return_value = mock_client
-
-            # Also mock MOCK_DISCOUNTS to be empty
-            with patch("agents.discount_optimizer.discount_matcher.MOCK_DISCOUNTS", []):
-                result = optimize_shopping(
-                    latitude=55.6761,
-                    longitude=12.5683,
-                    meal_plan=["taco"],
-                    timeframe="this week",
-                    maximize_savings=True,
-                    minimize_stores=False,
-                    prefer_organic=False,
-                )
-
-                assert not result["success"], "Expected failure when no products available"
-                assert "error" in result
-                assert (
-                    "no discounts" in result["error"].lower() or "area" in result["error"].lower()
-                )
-
-                print("✓ Test passed!")
-                print(f"  - Error message: {result['error']}")
+        result = optimize_shopping(
+            latitude=55.6761,
+            longitude=12.5683,
+            meal_plan=["taco", "pasta"],
+            timeframe="this week",
+            maximize_savings=True,
+            minimize_stores=True,
+            prefer_organic=False,
+        )
+
+        assert result["success"], f"Optimization failed: {result.get('error')}"
+        assert "recommendation" in result
+        assert result["total_savings"] > 0
+        assert result["num_purchases"] > 0
+
+        log.debug("total_savings=%.2f", result["total_savings"])
+        log.debug("num_purchases=%d", result["num_purchases"])
 
     @staticmethod
-    def test_invalid_location():
+    @pytest.mark.parametrize(
+        ("latitude", "fetch_result", "empty_fallback", "error_terms"),
+        [
+            pytest.param(
+                55.6761,
+                Exception("API connection failed"),
+                False,
+                ("matching discounts", "error"),
+                id="salling_api_failure",
+            ),
+            pytest.param(55.6761, [], True, ("no discounts", "area"), id="no_products_available"),
+            pytest.param(95.0, [], False, ("validation", "latitude"), id="invalid_location"),
+        ],
+    )
+    def test_workflow_failure(
+        latitude, fetch_result, empty_fallback, error_terms, stub_salling_client, monkeypatch
+    ):
         """
-        Test error handling with invalid location coordinates.
-        Requirements: 1.3, 9.1
+        Test error handling when the Salling API fails, no products are available,
+        or the location is invalid.
+        Requirements: 1.3, 2.6, 9.1, 11.2
         """
-        print("\n=== Test 4: Invalid Location ===")
+        if isinstance(fetch_result, Exception):
+            stub_salling_client.error = fetch_result
+        else:
+            stub_salling_client.items = fetch_result
+        if empty_fallback:
+            # No cache and no MOCK_DISCOUNTS to fall back to
+            monkeypatch.setattr(discount_matcher, "MOCK_DISCOUNTS", [])
 
-        # Test with invalid latitude (> 90)
         result = optimize_shopping(
-            latitude=95.0,  # Invalid
+            latitude=latitude,
             longitude=12.5683,
             meal_plan=["taco"],
             timeframe="this week",
@@ -252,288 +262,167 @@ class TestIntegrationWithMockedAPIs:
             prefer_organic=False,
         )
 
-        assert not result["success"], "Expected failure for invalid latitude"
+        assert not result["success"], "Expected optimization to fail"
         assert "error" in result
-        assert "validation" in result["error"].lower() or "latitude" in result["error"].lower()
+        assert any(term in result["error"].lower() for term in error_terms)
 
-        print("✓ Test passed!")
-        print(f"  - Error message: {result['error']}")
+        log.debug("error=%s", result["error"])
 
     @staticmethod
-    def test_caching_behavior():
+    def test_caching_behavior(salling_client, mock_discounts):
         """
         Test that caching works correctly for Salling API.
         Requirements: 2.5
         """
-        print("\n=== Test 5: Caching Behavior ===")
-
-        client = SallingAPIClient(api_key="test_key")
-        mock_discounts = create_mock_discounts()
-
         # Cache some data
-        client.cache_campaigns(mock_discounts, ttl_hours=24)
+        salling_client.cache_campaigns(mock_discounts, ttl_hours=24)
 
         # Retrieve cached data
-        cached = client.get_cached_campaigns()
+        cached = salling_client.get_cached_campaigns()
 
         assert cached is not None, "Expected cached data to be available"
         assert len(cached) == len(mock_discounts), "Cached data length mismatch"
         assert cached[0].product_name == mock_discounts[0].product_name
 
-        print("✓ Test passed!")
-        print(f"  - Cached {len(cached)} items")
+        log.debug("cached_items=%d", len(cached))
 
         # Test cache expiration
-        client.cache_campaigns(mock_discounts, ttl_hours=0)
-        client._cache_timestamp = datetime.now() - timedelta(hours=25)
+        salling_client.cache_campaigns(mock_discounts, ttl_hours=0)
+        salling_client._cache_timestamp = datetime.now() - timedelta(hours=25)
 
-        expired_cache = client.get_cached_campaigns()
+        expired_cache = salling_client.get_cached_campaigns()
         assert expired_cache is None, "Expected cache to be expired"
 
-        print("  - Cache expiration works correctly")
-
     @staticmethod
-    def test_products_expiring_today():
+    def test_products_expiring_today(stub_salling_client):
         """
         Test edge case: products expiring today.
         Requirements: 5.4, 7.1, 7.3
         """
-        print("\n=== Test 6: Products Expiring Today ===")
+        # Mock Salling API
+        stub_salling_client.items = create_high_discount_mock_data()
 
-        mock_discounts = create_high_discount_mock_data()
+        result = optimize_shopping(
+            latitude=55.6761,
+            longitude=12.5683,
+            meal_plan=["taco"],
+            timeframe="this week",
+            maximize_savings=True,
+            minimize_stores=False,
+            prefer_organic=False,
+        )
 
-        # Mock Salling API
-        with patch("agents.discount_optimizer.discount_matcher.SallingAPIClient") as mock_salling:
-            mock_client = Mock()
-            mock_client.fetch_campaigns.return_value = mock_discounts
-            mock_salling.return_value = mock_client
-
-            result = optimize_shopping(
-                latitude=55.6761,
-                longitude=12.5683,
-                meal_plan=["taco"],
-                timeframe="this week",
-                maximize_savings=True,
-                minimize_stores=False,
-                prefer_organic=False,
+        # Should succeed and include the expiring product
+        if result["success"]:
+            recommendation = result["recommendation"]
+            # Check if tips mention expiration
+            has_expiration_tip = (
+                "expires" in recommendation.lower() or "today" in recommendation.lower()
             )
 
-            # Should succeed and include the expiring product
-            if result["success"]:
-                recommendation = result["recommendation"]
-                # Check if tips mention expiration
-                has_expiration_tip = (
-                    "expires" in recommendation.lower() or "today" in recommendation.lower()
-                )
-
-                print("✓ Test passed!")
-                print(f"  - Includes expiration warning: {has_expiration_tip}")
-                print(f"  - Total savings: {result['total_savings']:.2f} DKK")
-            else:
-                # Might fail if no matching ingredients, which is acceptable
-                print("✓ Test passed (no matching products)!")
-                print(f"  - Error: {result['error']}")
+            log.debug("has_expiration_tip=%s", has_expiration_tip)
+            log.debug("total_savings=%.2f", result["total_savings"])
+        else:
+            # Might fail if no matching ingredients, which is acceptable
+            log.debug("error=%s", result["error"])
 
     @staticmethod
-    def test_very_high_discounts():
+    @pytest.mark.parametrize(
+        ("original_price", "discount_price", "savings", "discount_percent"),
+        [(100.0, 10.0, 90.0, 90.0)],
+    )
+    def test_very_high_discount_arithmetic(
+        original_price, discount_price, savings, discount_percent
+    ):
         """
-        Test edge case: products with very high discount percentages (>80%).
+        Test edge case: savings arithmetic for very high discount percentages (>80%).
         Requirements: 6.3, 7.2
         """
-        print("\n=== Test 7: Very High Discounts ===")
-
-        mock_discounts = create_high_discount_mock_data()
-
-        # Verify the discount calculation
-        discount = mock_discounts[0]
-        expected_savings = discount.original_price - discount.discount_price
-
-        assert discount.discount_percent == 90.0, "Expected 90% discount"
-        assert expected_savings == 90.0, "Expected 90 DKK savings"
-
-        print("✓ Test passed!")
-        print(f"  - Product: {discount.product_name}")
-        print(f"  - Original: {discount.original_price:.2f} DKK")
-        print(f"  - Discount: {discount.discount_price:.2f} DKK")
-        print(f"  - Savings: {expected_savings:.2f} DKK ({discount.discount_percent:.0f}%)")
+        assert original_price - discount_price == savings
+        assert savings / original_price * 100 == discount_percent
 
     @staticmethod
-    def test_gemini_api_failure():
+    @pytest.mark.vcr
+    @pytest.mark.usefixtures("recorded_api_keys")
+    def test_gemini_api_failure(monkeypatch):
         """
         Test error handling when Gemini API fails.
         Requirements: 3.5, 11.2
         """
-        print("\n=== Test 8: Gemini API Failure ===")
-
-        mock_discounts = create_mock_discounts()
-
-        # Mock Salling API to succeed
-        with patch("agents.discount_optimizer.discount_matcher.SallingAPIClient") as mock_salling:
-            mock_client = Mock()
-            mock_client.fetch_campaigns.return_value = mock_discounts
-            mock_salling.return_value = mock_client
-
-            # Mock Gemini API to fail
-            with patch("agents.discount_optimizer.meal_suggester.genai") as mock_genai:
-                mock_genai.GenerativeModel.side_effect = Exception("Gemini API unavailable")
-
-                # Test with empty meal plan (triggers AI suggestions)
-                result = optimize_shopping(
-                    latitude=55.6761,
-                    longitude=12.5683,
-                    meal_plan=[],  # Empty to trigger AI
-                    timeframe="this week",
-                    maximize_savings=True,
-                    minimize_stores=False,
-                    prefer_organic=False,
-                )
-
-                # Should fall back to default meals
-                if result["success"]:
-                    print("✓ Test passed (fallback to default meals)!")
-                    print(f"  - Total savings: {result['total_savings']:.2f} DKK")
-                else:
-                    # Acceptable if no matching products for default meals
-                    print("✓ Test passed (no matching products for fallback)!")
-                    print(f"  - Error: {result['error']}")
+        # Salling responses are replayed from the cassette; only Gemini is forced to fail
+        stub_genai = SimpleNamespace(GenerativeModel=_unavailable_gemini_model)
+        monkeypatch.setattr(meal_suggester, "genai", stub_genai)
+
+        # Test with empty meal plan (triggers AI suggestions)
+        result = optimize_shopping(
+            latitude=55.6761,
+            longitude=12.5683,
+            meal_plan=[],  # Empty to trigger AI
+            timeframe="this week",
+            maximize_savings=True,
+            minimize_stores=False,
+            prefer_organic=False,
+        )
+
+        # Should fall back to default meals
+        if result["success"]:
+            log.debug("total_savings=%.2f", result["total_savings"])
+        else:
+            # Acceptable if no matching products for default meals
+            log.debug("error=%s", result["error"])
 
     @staticmethod
-    def test_cache_clear():
+    def test_cache_clear(salling_client, mock_discounts):
         """
         Test that cache can be cleared properly.
         Requirements: 2.5
         """
-        print("\n=== Test 9: Cache Clear ===")
-
-        client = SallingAPIClient(api_key="test_key")
-        mock_discounts = create_mock_discounts()
-
         # Cache data
-        client.cache_campaigns(mock_discounts)
-        assert client.get_cached_campaigns() is not None
+        salling_client.cache_campaigns(mock_discounts)
+        assert salling_client.get_cached_campaigns() is not None
 
         # Clear cache
-        client.clear_cache()
-        assert client.get_cached_campaigns() is None
-
-        print("✓ Test passed!")
-        print("  - Cache cleared successfully")
+        salling_client.clear_cache()
+        assert salling_client.get_cached_campaigns() is None
 
     @staticmethod
-    def test_multiple_stores_optimization():
+    def test_multiple_stores_optimization(stub_salling_client, mock_discounts):
         """
         Test optimization with products from multiple stores.
         Requirements: 4.2, 5.3, 10.5
         """
-        print("\n=== Test 10: Multiple Stores Optimization ===")
+        # Mock Salling API
+        stub_salling_client.items = mock_discounts
 
-        mock_discounts = create_mock_discounts()
+        # Test with minimize_stores=True
+        result_minimize = optimize_shopping(
+            latitude=55.6761,
+            longitude=12.5683,
+            meal_plan=["taco", "pasta"],
+            timeframe="this week",
+            maximize_savings=False,
+            minimize_stores=True,
+            prefer_organic=False,
+        )
 
-        # Mock Salling API
-        with patch("agents.discount_optimizer.discount_matcher.SallingAPIClient") as mock_salling:
-            mock_client = Mock()
-            mock_client.fetch_campaigns.return_value = mock_discounts
-            mock_salling.return_value = mock_client
-
-            # Test with minimize_stores=True
-            result_minimize = optimize_shopping(
-                latitude=55.6761,
-                longitude=12.5683,
-                meal_plan=["taco", "pasta"],
-                timeframe="this week",
-                maximize_savings=False,
-                minimize_stores=True,
-                prefer_organic=False,
-            )
+        # Test with minimize_stores=False
+        result_no_minimize = optimize_shopping(
+            latitude=55.6761,
+            longitude=12.5683,
+            meal_plan=["taco", "pasta"],
+            timeframe="this week",
+            maximize_savings=True,
+            minimize_stores=False,
+            prefer_organic=False,
+        )
 
-            # Test with minimize_stores=False
-            result_no_minimize = optimize_shopping(
-                latitude=55.6761,
-                longitude=12.5683,
-                meal_plan=["taco", "pasta"],
-                timeframe="this week",
-                maximize_savings=True,
-                minimize_stores=False,
-                prefer_organic=False,
-            )
+        if result_minimize["success"] and result_no_minimize["success"]:
+            # Count stores in each result
+            stores_minimize = len(result_minimize.get("stores", []))
+            stores_no_minimize = len(result_no_minimize.get("stores", []))
 
-            if result_minimize["success"] and result_no_minimize["success"]:
-                # Count stores in each result
-                stores_minimize = len(result_minimize.get("stores", []))
-                stores_no_minimize = len(result_no_minimize.get("stores", []))
-
-                print("✓ Test passed!")
-                print(f"  - With minimize_stores: {stores_minimize} stores")
-                print(f"  - Without minimize_stores: {stores_no_minimize} stores")
-            else:
-                print("✓ Test passed (partial results)!")
-                print(f"  - Minimize stores success: {result_minimize['success']}")
-                print(f"  - No minimize success: {result_no_minimize['success']}")
-
-
-def run_all_tests():
-    """Run all integration tests with mocked APIs."""
-    print("=" * 70)
-    print("SHOPPING OPTIMIZER - INTEGRATION TESTS WITH MOCKED APIS")
-    print("=" * 70)
-
-    test_class = TestIntegrationWithMockedAPIs()
-
-    tests = [
-        ("Complete Workflow with Mocked APIs", test_class.test_complete_workflow_with_mocked_apis),
-        ("Salling API Failure", test_class.test_salling_api_failure),
-        ("No Products Available", test_class.test_no_products_available),
-        ("Invalid Location", test_class.test_invalid_location),
-        ("Caching Behavior", test_class.test_caching_behavior),
-        ("Products Expiring Today", test_class.test_products_expiring_today),
-        ("Very High Discounts", test_class.test_very_high_discounts),
-        ("Gemini API Failure", test_class.test_gemini_api_failure),
-        ("Cache Clear", test_class.test_cache_clear),
-        ("Multiple Stores Optimization", test_class.test_multiple_stores_optimization),
-    ]
-
-    passed = 0
-    failed = 0
-    results = []
-
-    for test_name, test_func in tests:
-        try:
-            result = test_func()
-            if result:
-                passed += 1
-                results.append(f"✓ {test_name}")
-            else:
-                failed += 1
-                results.append(f"✗ {test_name}")
-        except AssertionError as e:
-            failed += 1
-            results.append(f"✗ {test_name} - {e!s}")
-            print(f"  AssertionError: {e}")
-        except Exception as e:
-            failed += 1
-            results.append(f"✗ {test_name} - {e!s}")
-            print(f"  Exception: {e}")
-            import traceback
-
-            traceback.print_exc()
-
-    print("\n" + "=" * 70)
-    print("TEST RESULTS")
-    print("=" * 70)
-    for result in results:
-        print(result)
-
-    print("\n" + "=" * 70)
-    print(f"SUMMARY: {passed} passed, {failed} failed out of {len(tests)} tests")
-    print("=" * 70)
-
-    if failed == 0:
-        print("\n🎉 All integration tests passed!")
-        return 0
-    print(f"\n⚠️  {failed} test(s) failed")
-    return 1
-
-
-if __name__ == "__main__":
-    exit_code = run_all_tests()
-    sys.exit(exit_code)
+            log.debug("stores_with_minimize=%d", stores_minimize)
+            log.debug("stores_without_minimize=%d", stores_no_minimize)
+        else:
+            log.debug("minimize_success=%s", result_minimize["success"])
+            log.debug("no_minimize_success=%s", result_no_minimize["success"])
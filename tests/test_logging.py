@@ -5,7 +5,9 @@ This module tests the logging configuration, context management,
 and correlation ID tracking.
 """
 
-import uuid
+import re
+
+import pytest
 
 from agents.discount_optimizer.logging import (
     LogContext,
@@ -21,6 +23,24 @@ from agents.discount_optimizer.logging import (
 )
 
 
+_LOGGER = get_logger(__name__)
+
+_UUID_RE = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$")
+
+
+def _assert_uuid(value: str) -> None:
+    """Assert that value is a canonical lowercase UUID string."""
+    assert _UUID_RE.match(value), f"Not a valid UUID: {value!r}"
+
+
+@pytest.fixture(autouse=True)
+def _clean_context():
+    """Reset logging context variables before and after every test."""
+    clear_context()
+    yield
+    clear_context()
+
+
 class TestCorrelationID:
     """Test correlation ID generation and management."""
 
@@ -30,107 +50,74 @@ class TestCorrelationID:
 
         # Should be a valid UUID string
         assert isinstance(correlation_id, str)
-        uuid.UUID(correlation_id)  # Raises ValueError if invalid
-
-    def test_set_and_get_correlation_id(self):
-        """Test setting and retrieving correlation ID."""
-        clear_context()
-
-        test_id = "test-correlation-123"
-        set_correlation_id(test_id)
-
-        assert get_correlation_id() == test_id
+        _assert_uuid(correlation_id)
 
     def test_set_correlation_id_generates_if_none(self):
         """Test that set_correlation_id generates ID if none provided."""
-        clear_context()
-
         correlation_id = set_correlation_id(None)
 
         assert correlation_id is not None
         assert get_correlation_id() == correlation_id
-        uuid.UUID(correlation_id)  # Should be valid UUID
+        _assert_uuid(correlation_id)
 
 
 class TestRequestID:
     """Test request ID management."""
 
-    def test_set_and_get_request_id(self):
-        """Test setting and retrieving request ID."""
-        clear_context()
-
-        test_id = "test-request-456"
-        set_request_id(test_id)
-
-        assert get_request_id() == test_id
-
     def test_set_request_id_generates_if_none(self):
         """Test that set_request_id generates ID if none provided."""
-        clear_context()
-
         request_id = set_request_id(None)
 
         assert request_id is not None
         assert get_request_id() == request_id
-        uuid.UUID(request_id)  # Should be valid UUID
+        _assert_uuid(request_id)
 
 
-class TestAgentContext:
-    """Test agent context management."""
-
-    def test_set_and_get_agent_context(self):
-        """Test setting and retrieving agent context."""
-        clear_context()
+class TestContextAccessors:
+    """Test setting and retrieving each context variable."""
 
-        agent_name = "meal_suggester"
-        set_agent_context(agent_name)
+    @pytest.mark.parametrize(
+        ("setter", "getter", "value"),
+        [
+            (set_correlation_id, get_correlation_id, "test-correlation-123"),
+            (set_request_id, get_request_id, "test-request-456"),
+            (set_agent_context, get_agent_context, "meal_suggester"),
+        ],
+        ids=["correlation_id", "request_id", "agent"],
+    )
+    def test_set_and_get(self, setter, getter, value):
+        """Test that a value set on a context variable is returned by its getter."""
+        setter(value)
 
-        assert get_agent_context() == agent_name
+        assert getter() == value
 
 
 class TestLogContext:
     """Test LogContext context manager."""
 
-    def test_log_context_sets_correlation_id(self):
-        """Test that LogContext sets correlation ID."""
-        clear_context()
-
-        test_id = "context-test-123"
-
-        with LogContext(correlation_id=test_id):
-            assert get_correlation_id() == test_id
+    @pytest.mark.parametrize(
+        ("kwarg", "getter", "value"),
+        [
+            ("correlation_id", get_correlation_id, "context-test-123"),
+            ("request_id", get_request_id, "request-test-456"),
+            ("agent", get_agent_context, "test_agent"),
+        ],
+        ids=["correlation_id", "request_id", "agent"],
+    )
+    def test_log_context_sets_value(self, kwarg, getter, value):
+        """Test that LogContext sets each context variable it is given."""
+        with LogContext(**{kwarg: value}):
+            assert getter() == value
 
     def test_log_context_generates_correlation_id_if_none(self):
         """Test that LogContext generates correlation ID if not provided."""
-        clear_context()
-
         with LogContext():
             correlation_id = get_correlation_id()
             assert correlation_id is not None
-            uuid.UUID(correlation_id)  # Should be valid UUID
-
-    def test_log_context_sets_request_id(self):
-        """Test that LogContext sets request ID."""
-        clear_context()
-
-        test_id = "request-test-456"
-
-        with LogContext(request_id=test_id):
-            assert get_request_id() == test_id
-
-    def test_log_context_sets_agent(self):
-        """Test that LogContext sets agent context."""
-        clear_context()
-
-        agent_name = "test_agent"
-
-        with LogContext(agent=agent_name):
-            assert get_agent_context() == agent_name
+            _assert_uuid(correlation_id)
 
     def test_log_context_restores_previous_values(self):
         """Test that LogContext restores previous context on exit."""
-        clear_context()
-
         # Set initial values
         initial_correlation = "initial-123"
         initial_request = "initial-456"
@@ -153,8 +140,6 @@ class TestLogContext:
 
     def test_log_context_nested(self):
         """Test nested LogContext managers."""
-        clear_context()
-
         with LogContext(correlation_id="outer-123"):
             assert get_correlation_id() == "outer-123"
 
@@ -197,12 +182,10 @@ class TestLogger:
 
     def test_logger_includes_correlation_id(self):
         """Test that logger includes correlation ID in output."""
-        clear_context()
-
         test_id = "log-test-123"
         set_correlation_id(test_id)
 
-        logger = get_logger(__name__)
+        logger = _LOGGER
 
         # This test verifies the logger can be called
         # Actual output verification would require capturing log output
@@ -210,9 +193,7 @@ class TestLogger:
 
     def test_logger_with_context_manager(self):
         """Test logger with LogContext context manager."""
-        clear_context()
-
-        logger = get_logger(__name__)
+        logger = _LOGGER
 
         with LogContext(correlation_id="context-123", agent="test_agent"):
             # Logger should include context in output
@@ -6,9 +6,11 @@ API calls. All Gemini responses are mocked using pytest-mock.
 """
 
 from datetime import date, timedelta
+from typing import Any
 from unittest.mock import MagicMock
 
 import pytest
+from pydantic import ValidationError
 
 from agents.discount_optimizer.agents.meal_suggester_agent import (
     MealSuggesterAgent,
@@ -17,15 +19,17 @@ from agents.discount_optimizer.agents.meal_suggester_agent import (
 )
 
 
+# Keep every test sharing the session-scoped agent on one xdist worker.
+pytestmark = pytest.mark.xdist_group("suggester_agent")
+
+
 # ============================================================================
 # Fixtures
 # ============================================================================
 
 
-@pytest.fixture
-def mock_gemini_json_response() -> str:
-    """Fixture providing a valid JSON response from Gemini."""
-    return """{
+# A valid JSON response from Gemini.
+MOCK_GEMINI_JSON_RESPONSE = """{
     "suggested_meals": [
         "Breakfast Quesadillas with Spicy Ground Beef",
         "Lunchtime Taco Salad Bowls",
@@ -36,10 +40,8 @@ def mock_gemini_json_response() -> str:
 }"""
 
 
-@pytest.fixture
-def mock_gemini_dict_response() -> str:
-    """Fixture providing a response with meal objects (dict format)."""
-    return """{
+# A response with meal objects (dict format).
+MOCK_GEMINI_DICT_RESPONSE = """{
     "suggested_meals": [
         {"meal": "Taco Tuesday", "ingredients": ["tortillas", "beef", "cheese"]},
         {"meal_name": "Pasta Carbonara", "ingredients": ["pasta", "cheese"]},
@@ -50,10 +52,8 @@ def mock_gemini_dict_response() -> str:
 }"""
 
 
-@pytest.fixture
-def mock_gemini_text_response() -> str:
-    """Fixture providing a plain text response (fallback parsing)."""
-    return """1. Breakfast Burrito
+# A plain text response (fallback parsing).
+MOCK_GEMINI_TEXT_RESPONSE = """1. Breakfast Burrito
 2. Taco Salad
 3. Quesadillas"""
 
@@ -61,40 +61,60 @@ def mock_gemini_text_response() -> str:
 @pytest.fixture
 def basic_input() -> MealSuggestionInput:
     """Fixture providing basic input data."""
-    return MealSuggestionInput(
-        available_products=["tortillas", "hakket oksekød", "ost", "salat"],
-        num_meals=3,
-        user_preferences="quick and easy meals",
+    return MealSuggestionInput.model_validate(
+        {
+            "available_products": ["tortillas", "hakket oksekød", "ost", "salat"],
+            "num_meals": 3,
+            "user_preferences": "quick and easy meals",
+        }
     )
 
 
 @pytest.fixture
-def input_with_urgency() -> MealSuggestionInput:
-    """Fixture providing input with expiration urgency."""
+def urgency_details() -> list[dict[str, Any]]:
+    """Fixture providing product details with expiration dates relative to today."""
     today = date.today()
-    return MealSuggestionInput(
+    return [
+        {
+            "name": "tortillas",
+            "expiration_date": (today + timedelta(days=1)).isoformat(),
+            "discount_percent": 30,
+        },
+        {
+            "name": "hakket oksekød",
+            "expiration_date": (today + timedelta(days=1)).isoformat(),
+            "discount_percent": 25,
+        },
+        {
+            "name": "ost",
+            "expiration_date": (today + timedelta(days=7)).isoformat(),
+            "discount_percent": 20,
+        },
+    ]
+
+
+@pytest.fixture
+def input_with_urgency(urgency_details: list[dict[str, Any]]) -> MealSuggestionInput:
+    """Fixture providing input with expiration urgency (validation not under test)."""
+    return MealSuggestionInput.model_construct(
         available_products=["tortillas", "hakket oksekød", "ost"],
         num_meals=2,
-        product_details=[
-            {
-                "name": "tortillas",
-                "expiration_date": (today + timedelta(days=1)).isoformat(),
-                "discount_percent": 30,
-            },
-            {
-                "name": "hakket oksekød",
-                "expiration_date": (today + timedelta(days=1)).isoformat(),
-                "discount_percent": 25,
-            },
-            {
-                "name": "ost",
-                "expiration_date": (today + timedelta(days=7)).isoformat(),
-                "discount_percent": 20,
-            },
-        ],
+        product_details=urgency_details,
     )
 
 
+@pytest.fixture(scope="session")
+def suggester_agent() -> MealSuggesterAgent:
+    """
+    Fixture providing one agent shared across the test session.
+
+    Building the agent sets up a google-genai client, so it is done once. Tests
+    patch ``client.models.generate_content`` via ``monkeypatch``, which reverts
+    after each test and keeps the shared agent clean.
+    """
+    return MealSuggesterAgent(api_key="test_key")
+
+
 # ============================================================================
 # Test: Agent Initialization
 # ============================================================================
@@ -138,7 +158,7 @@ def test_input_validation_valid():
 
 def test_input_validation_num_meals_too_high():
     """Test that num_meals > 10 is rejected."""
-    with pytest.raises(Exception):  # Pydantic ValidationError
+    with pytest.raises(ValidationError):
         MealSuggestionInput(
             available_products=["product1"],
             num_meals=15,  # Max is 10
@@ -147,7 +167,7 @@ def test_input_validation_num_meals_too_high():
 
 def test_input_validation_empty_products():
     """Test that empty products list is rejected."""
-    with pytest.raises(Exception):  # Pydantic ValidationError
+    with pytest.raises(ValidationError):
         MealSuggestionInput(
             available_products=[],  # Min length is 1
             num_meals=3,
@@ -156,7 +176,7 @@ def test_input_validation_empty_products():
 
 def test_input_validation_num_meals_zero():
     """Test that num_meals = 0 is rejected."""
-    with pytest.raises(Exception):  # Pydantic ValidationError
+    with pytest.raises(ValidationError):
         MealSuggestionInput(
             available_products=["product1"],
             num_meals=0,  # Min is 1
@@ -170,10 +190,12 @@ def test_input_validation_num_meals_zero():
 
 def test_output_validation_valid():
     """Test that valid output is accepted."""
-    output = MealSuggestionOutput(
-        suggested_meals=["Taco", "Pasta", "Salad"],
-        reasoning="These meals use available products efficiently",
-        urgency_notes="Use tortillas first",
+    output = MealSuggestionOutput.model_validate(
+        {
+            "suggested_meals": ["Taco", "Pasta", "Salad"],
+            "reasoning": "These meals use available products efficiently",
+            "urgency_notes": "Use tortillas first",
+        }
     )
 
     assert len(output.suggested_meals) == 3
@@ -182,7 +204,7 @@ def test_output_validation_valid():
 
 def test_output_validation_empty_meals():
     """Test that empty meals list is rejected."""
-    with pytest.raises(Exception):  # Pydantic ValidationError
+    with pytest.raises(ValidationError):
         MealSuggestionOutput(
             suggested_meals=[],  # Min length is 1
             reasoning="No meals",
@@ -190,102 +212,69 @@ def test_output_validation_empty_meals():
 
 
 # ============================================================================
-# Test: JSON Parsing (Valid JSON)
-# ============================================================================
-
-
-@pytest.mark.asyncio
-async def test_suggest_meals_parses_valid_json(
-    monkeypatch, basic_input: MealSuggestionInput, mock_gemini_json_response: str
-):
-    """Test that agent correctly parses valid JSON response from Gemini."""
-    # Mock the Gemini API response
-    mock_response = MagicMock()
-    mock_response.text = mock_gemini_json_response
-    mock_response.candidates = [MagicMock()]
-    mock_response.candidates[0].content.parts = [MagicMock()]
-    mock_response.candidates[0].content.parts[0].text = mock_gemini_json_response
-
-    # Patch the client's generate_content method
-    agent = MealSuggesterAgent(api_key="test_key")
-    monkeypatch.setattr(agent.client.models, "generate_content", lambda **kwargs: mock_response)
-
-    # Act
-    output = await agent.suggest_meals(basic_input)
-
-    # Assert
-    assert isinstance(output, MealSuggestionOutput)
-    assert len(output.suggested_meals) == 3
-    assert output.suggested_meals[0] == "Breakfast Quesadillas with Spicy Ground Beef"
-    assert output.suggested_meals[1] == "Lunchtime Taco Salad Bowls"
-    assert output.suggested_meals[2] == "Ground Beef Tortilla Pinwheels"
-    assert "prioritize products expiring soon" in output.reasoning
-    assert "tortillas and ground beef first" in output.urgency_notes
-
-
-# ============================================================================
-# Test: JSON Parsing (Dict Format)
+# Test: Response Parsing (JSON, Dict Format, Text Fallback)
 # ============================================================================
 
 
 @pytest.mark.asyncio
-async def test_suggest_meals_parses_dict_format(
-    monkeypatch, basic_input: MealSuggestionInput, mock_gemini_dict_response: str
+@pytest.mark.parametrize(
+    ("response_text", "expected_meals", "expected_reasoning", "expected_urgency"),
+    [
+        pytest.param(
+            MOCK_GEMINI_JSON_RESPONSE,
+            [
+                "Breakfast Quesadillas with Spicy Ground Beef",
+                "Lunchtime Taco Salad Bowls",
+                "Ground Beef Tortilla Pinwheels",
+            ],
+            "These meals prioritize products expiring soon and offer diverse meal types.",
+            "Use tortillas and ground beef first (expire in 1 day)",
+            id="valid_json",
+        ),
+        pytest.param(
+            MOCK_GEMINI_DICT_RESPONSE,
+            # Meal names are extracted from the different dict keys
+            ["Taco Tuesday", "Pasta Carbonara", "Grøntsagssuppe"],
+            "Meals use available products efficiently",
+            "",
+            id="dict_format",
+        ),
+        pytest.param(
+            MOCK_GEMINI_TEXT_RESPONSE,
+            ["Breakfast Burrito", "Taco Salad", "Quesadillas"],
+            "Meals suggested based on available products",
+            "",
+            id="text_fallback",
+        ),
+    ],
+)
+async def test_suggest_meals_parses_response(
+    suggester_agent: MealSuggesterAgent,
+    monkeypatch,
+    basic_input: MealSuggestionInput,
+    response_text: str,
+    expected_meals: list[str],
+    expected_reasoning: str,
+    expected_urgency: str,
+    fake_gemini_response,
 ):
-    """Test that agent handles meal objects (dict format) in response."""
+    """Test that agent parses JSON, dict-format and plain text responses from Gemini."""
     # Mock the Gemini API response
-    mock_response = MagicMock()
-    mock_response.text = mock_gemini_dict_response
-    mock_response.candidates = [MagicMock()]
-    mock_response.candidates[0].content.parts = [MagicMock()]
-    mock_response.candidates[0].content.parts[0].text = mock_gemini_dict_response
-
-    # Patch the client's generate_content method
-    agent = MealSuggesterAgent(api_key="test_key")
-    monkeypatch.setattr(agent.client.models, "generate_content", lambda **kwargs: mock_response)
-
-    # Act
-    output = await agent.suggest_meals(basic_input)
-
-    # Assert
-    assert isinstance(output, MealSuggestionOutput)
-    assert len(output.suggested_meals) == 3
-    # Should extract meal names from different dict keys
-    assert output.suggested_meals[0] == "Taco Tuesday"
-    assert output.suggested_meals[1] == "Pasta Carbonara"
-    assert output.suggested_meals[2] == "Grøntsagssuppe"
-
-
-# ============================================================================
-# Test: Text Parsing (Fallback)
-# ============================================================================
-
-
-@pytest.mark.asyncio
-async def test_suggest_meals_fallback_text_parsing(
-    monkeypatch, basic_input: MealSuggestionInput, mock_gemini_text_response: str
-):
-    """Test that agent falls back to text parsing when JSON parsing fails."""
-    # Mock the Gemini API response (plain text, not JSON)
-    mock_response = MagicMock()
-    mock_response.text = mock_gemini_text_response
-    mock_response.candidates = [MagicMock()]
-    mock_response.candidates[0].content.parts = [MagicMock()]
-    mock_response.candidates[0].content.parts[0].text = mock_gemini_text_response
+    mock_response = fake_gemini_response(response_text)
 
     # Patch the client's generate_content method
-    agent = MealSuggesterAgent(api_key="test_key")
-    monkeypatch.setattr(agent.client.models, "generate_content", lambda **kwargs: mock_response)
+    monkeypatch.setattr(
+        suggester_agent.client.models, "generate_content", lambda **kwargs: mock_response
+    )
 
     # Act
-    output = await agent.suggest_meals(basic_input)
+    output = await suggester_agent.suggest_meals(basic_input)
 
     # Assert
     assert isinstance(output, MealSuggestionOutput)
-    assert len(output.suggested_meals) == 3
-    assert "Breakfast Burrito" in output.suggested_meals
-    assert "Taco Salad" in output.suggested_meals
-    assert "Quesadillas" in output.suggested_meals
+    assert output.suggested_meals == expected_meals
+    assert output.reasoning == expected_reasoning
+    assert output.urgency_notes == expected_urgency
 
 
 # ============================================================================
@@ -295,15 +284,14 @@ async def test_suggest_meals_fallback_text_parsing(
 
 @pytest.mark.asyncio
 async def test_format_products_with_urgency(
-    monkeypatch, input_with_urgency: MealSuggestionInput, mock_gemini_json_response: str
+    suggester_agent: MealSuggesterAgent,
+    monkeypatch,
+    input_with_urgency: MealSuggestionInput,
+    fake_gemini_response,
 ):
     """Test that products with expiration dates are formatted with urgency markers."""
     # Mock the Gemini API response
-    mock_response = MagicMock()
-    mock_response.text = mock_gemini_json_response
-    mock_response.candidates = [MagicMock()]
-    mock_response.candidates[0].content.parts = [MagicMock()]
-    mock_response.candidates[0].content.parts[0].text = mock_gemini_json_response
+    mock_response = fake_gemini_response(MOCK_GEMINI_JSON_RESPONSE)
 
     # Capture the prompt
     captured_prompt = {}
@@ -313,11 +301,10 @@ async def test_format_products_with_urgency(
         return mock_response
 
     # Patch the client's generate_content method
-    agent = MealSuggesterAgent(api_key="test_key")
-    monkeypatch.setattr(agent.client.models, "generate_content", mock_generate)
+    monkeypatch.setattr(suggester_agent.client.models, "generate_content", mock_generate)
 
     # Act
-    await agent.suggest_meals(input_with_urgency)
+    await suggester_agent.suggest_meals(input_with_urgency)
 
     # Assert - check that the prompt contains urgency markers
     prompt = captured_prompt["contents"]
@@ -333,18 +320,19 @@ async def test_format_products_with_urgency(
 
 
 @pytest.mark.asyncio
-async def test_fallback_suggestions_on_api_error(monkeypatch, basic_input: MealSuggestionInput):
+async def test_fallback_suggestions_on_api_error(
+    suggester_agent: MealSuggesterAgent, monkeypatch, basic_input: MealSuggestionInput
+):
     """Test that agent provides fallback suggestions when Gemini API fails."""
 
     # Mock the Gemini API to raise an exception
     def mock_generate_error(**kwargs):
         raise Exception("API Error")
 
-    agent = MealSuggesterAgent(api_key="test_key")
-    monkeypatch.setattr(agent.client.models, "generate_content", mock_generate_error)
+    monkeypatch.setattr(suggester_agent.client.models, "generate_content", mock_generate_error)
 
     # Act
-    output = await agent.run(basic_input)
+    output = await suggester_agent.run(basic_input)
 
     # Assert - should get fallback suggestions
     assert isinstance(output, MealSuggestionOutput)
@@ -353,21 +341,19 @@ async def test_fallback_suggestions_on_api_error(monkeypatch, basic_input: MealS
 
 
 @pytest.mark.asyncio
-async def test_fallback_suggestions_contain_relevant_meals():
+async def test_fallback_suggestions_contain_relevant_meals(suggester_agent: MealSuggesterAgent):
     """Test that fallback suggestions are relevant to available products."""
-    agent = MealSuggesterAgent(api_key="test_key")
-
     # Test with tortilla products
     input_tortilla = MealSuggestionInput(
         available_products=["tortillas", "hakket oksekød"], num_meals=3
     )
-    output = agent._fallback_suggestions(input_tortilla)
+    output = suggester_agent._fallback_suggestions(input_tortilla)
 
     assert "Taco" in output.suggested_meals
 
     # Test with pasta products
     input_pasta = MealSuggestionInput(available_products=["pasta", "tomatsauce"], num_meals=3)
-    output = agent._fallback_suggestions(input_pasta)
+    output = suggester_agent._fallback_suggestions(input_pasta)
 
     assert "Pasta Bolognese" in output.suggested_meals
 
@@ -377,8 +363,7 @@ async def test_fallback_suggestions_contain_relevant_meals():
 # ============================================================================
 
 
-@pytest.mark.asyncio
-async def test_dietary_restrictions_in_prompt(monkeypatch, mock_gemini_json_response: str):
+def test_dietary_restrictions_in_prompt(suggester_agent: MealSuggesterAgent):
     """Test that dietary restrictions are included in the prompt."""
     # Create input with dietary restrictions
     input_data = MealSuggestionInput(
@@ -388,30 +373,10 @@ async def test_dietary_restrictions_in_prompt(monkeypatch, mock_gemini_json_resp
         user_preferences="vegetarian meals",
     )
 
-    # Mock the Gemini API response
-    mock_response = MagicMock()
-    mock_response.text = mock_gemini_json_response
-    mock_response.candidates = [MagicMock()]
-    mock_response.candidates[0].content.parts = [MagicMock()]
-    mock_response.candidates[0].content.parts[0].text = mock_gemini_json_response
-
-    # Capture the prompt
-    captured_prompt = {}
-
-    def mock_generate(**kwargs):
-        captured_prompt["contents"] = kwargs.get("contents", "")
-        return mock_response
-
-    # Patch the client's generate_content method
-    agent = MealSuggesterAgent(api_key="test_key")
-    monkeypatch.setattr(agent.client.models, "generate_content", mock_generate)
-
-    # Act
-    await agent.suggest_meals(input_data)
+    # Act - build the prompt directly; no Gemini call or response parsing needed
+    prompt = suggester_agent._create_prompt(input_data)
 
     # Assert - check that the prompt contains dietary restrictions
-    prompt = captured_prompt["contents"]
-
     assert "kylling" in prompt
     assert "fisk" in prompt
     assert "vegetarian meals" in prompt
@@ -422,8 +387,7 @@ async def test_dietary_restrictions_in_prompt(monkeypatch, mock_gemini_json_resp
 # ============================================================================
 
 
-@pytest.mark.asyncio
-async def test_meal_type_filtering_in_prompt(monkeypatch, mock_gemini_json_response: str):
+def test_meal_type_filtering_in_prompt(suggester_agent: MealSuggesterAgent):
     """Test that meal type filters are included in the prompt."""
     # Create input with specific meal types
     input_data = MealSuggestionInput(
@@ -432,30 +396,10 @@ async def test_meal_type_filtering_in_prompt(monkeypatch, mock_gemini_json_respo
         meal_types=["lunch", "dinner"],  # Only lunch and dinner
     )
 
-    # Mock the Gemini API response
-    mock_response = MagicMock()
-    mock_response.text = mock_gemini_json_response
-    mock_response.candidates = [MagicMock()]
-    mock_response.candidates[0].content.parts = [MagicMock()]
-    mock_response.candidates[0].content.parts[0].text = mock_gemini_json_response
-
-    # Capture the prompt
-    captured_prompt = {}
-
-    def mock_generate(**kwargs):
-        captured_prompt["contents"] = kwargs.get("contents", "")
-        return mock_response
-
-    # Patch the client's generate_content method
-    agent = MealSuggesterAgent(api_key="test_key")
-    monkeypatch.setattr(agent.client.models, "generate_content", mock_generate)
-
-    # Act
-    await agent.suggest_meals(input_data)
+    # Act - build the prompt directly; no Gemini call or response parsing needed
+    prompt = suggester_agent._create_prompt(input_data)
 
     # Assert - check that the prompt contains meal type filter
-    prompt = captured_prompt["contents"]
-
     assert "lunch, dinner" in prompt or ("lunch" in prompt and "dinner" in prompt)
 
 
@@ -464,10 +408,9 @@ async def test_meal_type_filtering_in_prompt(monkeypatch, mock_gemini_json_respo
 # ============================================================================
 
 
-def test_system_instruction_content():
+def test_system_instruction_content(suggester_agent: MealSuggesterAgent):
     """Test that system instruction contains key elements."""
-    agent = MealSuggesterAgent(api_key="test_key")
-    system_instruction = agent._get_system_instruction()
+    system_instruction = suggester_agent._get_system_instruction()
 
     assert "creative chef" in system_instruction.lower()
     assert "reduce food waste" in system_instruction.lower()
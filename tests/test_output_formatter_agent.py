@@ -14,16 +14,40 @@ Requirements: 2.1, 2.3, 3.1, 3.3
 
 from datetime import date, timedelta
 from decimal import Decimal
-from unittest.mock import MagicMock
 
 import pytest
+from pydantic import ValidationError
 
+from agents.discount_optimizer.agents import output_formatter_agent
 from agents.discount_optimizer.agents.output_formatter_agent import (
     FormattingInput,
     FormattingOutput,
     OutputFormatterAgent,
 )
 from agents.discount_optimizer.domain.models import Purchase, ShoppingRecommendation
+from agents.discount_optimizer.infrastructure.cache_repository import InMemoryCacheRepository
+
+
+# Keep every test sharing the session-scoped agent on one xdist worker.
+pytestmark = pytest.mark.xdist_group("formatter_agent")
+
+# Decimal amounts are parsed once at import rather than on every fixture call.
+_ZERO_SAVINGS = Decimal("0.00")
+_TOTAL_SAVINGS = Decimal("31.00")
+_TORTILLAS_PRICE, _TORTILLAS_SAVINGS = Decimal("14.95"), Decimal("10.00")
+_BEEF_PRICE, _BEEF_SAVINGS = Decimal("35.00"), Decimal("15.00")
+_PASTA_PRICE, _PASTA_SAVINGS = Decimal("12.00"), Decimal("6.00")
+
+# Canonical recommendation fields; tests override single fields and build the
+# nested ShoppingRecommendation with model_construct where it is not under test.
+_BASE_REC = {
+    "purchases": [],
+    "total_savings": _ZERO_SAVINGS,
+    "time_savings": 0.0,
+    "tips": [],
+    "motivation_message": "Great job!",
+    "stores": [],
+}
 
 
 # ============================================================================
@@ -31,10 +55,8 @@ from agents.discount_optimizer.domain.models import Purchase, ShoppingRecommenda
 # ============================================================================
 
 
-@pytest.fixture
-def mock_gemini_json_response() -> str:
-    """Fixture providing a valid JSON response from Gemini."""
-    return """{
+# A valid JSON response from Gemini.
+MOCK_GEMINI_JSON_RESPONSE = """{
     "tips": [
         "Shop early in the morning for the freshest products",
         "Check expiration dates carefully on discounted items",
@@ -46,16 +68,14 @@ def mock_gemini_json_response() -> str:
 }"""
 
 
-@pytest.fixture
-def mock_gemini_invalid_json_response() -> str:
-    """Fixture providing an invalid JSON response from Gemini."""
-    return """This is not valid JSON at all!
+# An invalid JSON response from Gemini.
+MOCK_GEMINI_INVALID_JSON_RESPONSE = """This is not valid JSON at all!
     Just some random text that will fail parsing."""
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_purchases() -> list[Purchase]:
-    """Create sample purchases for testing."""
+    """Create sample purchases for testing (shared per module; tests must not mutate)."""
     today = date.today()
 
     return [
@@ -63,32 +83,32 @@ def sample_purchases() -> list[Purchase]:
             product_name="Tortillas 8 stk",
             store_name="Føtex",
             purchase_day=today,
-            price=Decimal("14.95"),
-            savings=Decimal("10.00"),
+            price=_TORTILLAS_PRICE,
+            savings=_TORTILLAS_SAVINGS,
             meal_association="Taco Tuesday",
         ),
         Purchase(
             product_name="Hakket oksekød 8-12%",
             store_name="Føtex",
             purchase_day=today,
-            price=Decimal("35.00"),
-            savings=Decimal("15.00"),
+            price=_BEEF_PRICE,
+            savings=_BEEF_SAVINGS,
             meal_association="Taco Tuesday",
         ),
         Purchase(
             product_name="Pasta 500g",
             store_name="Netto",
             purchase_day=today + timedelta(days=1),
-            price=Decimal("12.00"),
-            savings=Decimal("6.00"),
+            price=_PASTA_PRICE,
+            savings=_PASTA_SAVINGS,
             meal_association="Pasta Carbonara",
         ),
     ]
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_stores() -> list[dict]:
-    """Create sample store data for testing."""
+    """Create sample store data for testing (shared per module; tests must not mutate)."""
     return [
         {
             "name": "Føtex",
@@ -105,12 +125,12 @@ def sample_stores() -> list[dict]:
     ]
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def formatting_input(sample_purchases, sample_stores) -> FormattingInput:
-    """Create sample formatting input."""
-    return FormattingInput(
+    """Create sample formatting input (validation not under test)."""
+    return FormattingInput.model_construct(
         purchases=sample_purchases,
-        total_savings=Decimal("31.00"),
+        total_savings=_TOTAL_SAVINGS,
         time_savings=15.0,
         stores=sample_stores,
         user_context="Family of 4, busy weeknights",
@@ -118,6 +138,18 @@ def formatting_input(sample_purchases, sample_stores) -> FormattingInput:
     )
 
 
+@pytest.fixture(scope="session")
+def formatter_agent() -> OutputFormatterAgent:
+    """
+    Fixture providing one agent shared across the test session.
+
+    Building the agent sets up a google-genai client, so it is done once. Tests
+    patch ``client.models.generate_content`` via ``monkeypatch``, which reverts
+    after each test and keeps the shared agent clean.
+    """
+    return OutputFormatterAgent(api_key="test_key")
+
+
 # ============================================================================
 # Input/Output Model Validation Tests
 # ============================================================================
@@ -127,14 +159,14 @@ def test_input_validation_valid(sample_purchases, sample_stores):
     """Test that valid input is accepted."""
     input_data = FormattingInput(
         purchases=sample_purchases,
-        total_savings=Decimal("31.00"),
+        total_savings=_TOTAL_SAVINGS,
         time_savings=15.0,
         stores=sample_stores,
         num_tips=5,
     )
 
     assert len(input_data.purchases) == 3
-    assert input_data.total_savings == Decimal("31.00")
+    assert input_data.total_savings == _TOTAL_SAVINGS
     assert input_data.time_savings == 15.0
     assert len(input_data.stores) == 2
     assert input_data.num_tips == 5
@@ -143,16 +175,16 @@ def test_input_validation_valid(sample_purchases, sample_stores):
 def test_input_validation_empty_purchases():
     """Test that empty purchases list is accepted."""
     input_data = FormattingInput(
-        purchases=[], total_savings=Decimal("0.00"), time_savings=0.0, stores=[], num_tips=3
+        purchases=[], total_savings=_ZERO_SAVINGS, time_savings=0.0, stores=[], num_tips=3
     )
 
     assert len(input_data.purchases) == 0
-    assert input_data.total_savings == Decimal("0.00")
+    assert input_data.total_savings == _ZERO_SAVINGS
 
 
 def test_input_validation_negative_savings():
     """Test that negative savings is rejected."""
-    with pytest.raises(Exception):  # Pydantic ValidationError
+    with pytest.raises(ValidationError):
         FormattingInput(
             purchases=[], total_savings=Decimal("-10.00"), time_savings=0.0, stores=[], num_tips=3
         )
@@ -160,10 +192,10 @@ def test_input_validation_negative_savings():
 
 def test_input_validation_invalid_num_tips():
     """Test that invalid num_tips is rejected."""
-    with pytest.raises(Exception):  # Pydantic ValidationError
+    with pytest.raises(ValidationError):
         FormattingInput(
             purchases=[],
-            total_savings=Decimal("0.00"),
+            total_savings=_ZERO_SAVINGS,
             time_savings=0.0,
             stores=[],
             num_tips=0,  # Must be >= 1
@@ -172,17 +204,22 @@ def test_input_validation_invalid_num_tips():
 
 def test_output_validation_valid(sample_purchases, sample_stores):
     """Test that valid output is accepted."""
-    output = FormattingOutput(
-        tips=["Tip 1", "Tip 2", "Tip 3"],
-        motivation_message="Great job planning ahead!",
-        formatted_recommendation=ShoppingRecommendation(
-            purchases=sample_purchases,
-            total_savings=Decimal("31.00"),
-            time_savings=15.0,
-            tips=["Tip 1", "Tip 2", "Tip 3"],
-            motivation_message="Great job planning ahead!",
-            stores=sample_stores,
-        ),
+    output = FormattingOutput.model_validate(
+        {
+            "tips": ["Tip 1", "Tip 2", "Tip 3"],
+            "motivation_message": "Great job planning ahead!",
+            "formatted_recommendation": ShoppingRecommendation.model_construct(
+                **{
+                    **_BASE_REC,
+                    "purchases": sample_purchases,
+                    "total_savings": _TOTAL_SAVINGS,
+                    "time_savings": 15.0,
+                    "tips": ["Tip 1", "Tip 2", "Tip 3"],
+                    "motivation_message": "Great job planning ahead!",
+                    "stores": sample_stores,
+                }
+            ),
+        }
     )
 
     assert len(output.tips) == 3
@@ -192,34 +229,22 @@ def test_output_validation_valid(sample_purchases, sample_stores):
 
 def test_output_validation_empty_tips():
     """Test that empty tips list is rejected."""
-    with pytest.raises(Exception):  # Pydantic ValidationError
+    with pytest.raises(ValidationError):
         FormattingOutput(
             tips=[],  # Must have at least 1 tip
             motivation_message="Great job!",
-            formatted_recommendation=ShoppingRecommendation(
-                purchases=[],
-                total_savings=Decimal("0.00"),
-                time_savings=0.0,
-                tips=[],
-                motivation_message="Great job!",
-                stores=[],
-            ),
+            formatted_recommendation=ShoppingRecommendation.model_construct(**_BASE_REC),
         )
 
 
 def test_output_validation_short_motivation():
     """Test that short motivation message is rejected."""
-    with pytest.raises(Exception):  # Pydantic ValidationError
+    with pytest.raises(ValidationError):
         FormattingOutput(
             tips=["Tip 1"],
             motivation_message="Hi",  # Too short (< 10 chars)
-            formatted_recommendation=ShoppingRecommendation(
-                purchases=[],
-                total_savings=Decimal("0.00"),
-                time_savings=0.0,
-                tips=["Tip 1"],
-                motivation_message="Hi",
-                stores=[],
+            formatted_recommendation=ShoppingRecommendation.model_construct(
+                **{**_BASE_REC, "tips": ["Tip 1"], "motivation_message": "Hi"}
             ),
         )
 
@@ -229,11 +254,9 @@ def test_output_validation_short_motivation():
 # ============================================================================
 
 
-def test_fallback_tips_generation(formatting_input):
+def test_fallback_tips_generation(formatter_agent: OutputFormatterAgent, formatting_input):
     """Test rule-based tip generation as fallback."""
-    agent = OutputFormatterAgent()
-
-    tips = agent._generate_fallback_tips(formatting_input)
+    tips = formatter_agent._generate_fallback_tips(formatting_input)
 
     assert isinstance(tips, list)
     assert len(tips) <= formatting_input.num_tips
@@ -241,54 +264,46 @@ def test_fallback_tips_generation(formatting_input):
     assert all(len(tip) > 10 for tip in tips)  # Tips should be meaningful
 
 
-def test_fallback_motivation_high_savings():
+def test_fallback_motivation_high_savings(formatter_agent: OutputFormatterAgent):
     """Test motivation message for high savings."""
-    agent = OutputFormatterAgent()
-
-    input_data = FormattingInput(
+    input_data = FormattingInput.model_construct(
         purchases=[], total_savings=Decimal("150.00"), time_savings=0.0, stores=[], num_tips=3
     )
 
-    motivation = agent._generate_fallback_motivation(input_data)
+    motivation = formatter_agent._generate_fallback_motivation(input_data)
 
     assert isinstance(motivation, str)
     assert len(motivation) > 10
     assert "150" in motivation or "saving" in motivation.lower()
 
 
-def test_fallback_motivation_medium_savings():
+def test_fallback_motivation_medium_savings(formatter_agent: OutputFormatterAgent):
     """Test motivation message for medium savings."""
-    agent = OutputFormatterAgent()
-
-    input_data = FormattingInput(
+    input_data = FormattingInput.model_construct(
         purchases=[], total_savings=Decimal("75.00"), time_savings=0.0, stores=[], num_tips=3
     )
 
-    motivation = agent._generate_fallback_motivation(input_data)
+    motivation = formatter_agent._generate_fallback_motivation(input_data)
 
     assert isinstance(motivation, str)
     assert len(motivation) > 10
 
 
-def test_fallback_motivation_low_savings():
+def test_fallback_motivation_low_savings(formatter_agent: OutputFormatterAgent):
     """Test motivation message for low savings."""
-    agent = OutputFormatterAgent()
-
-    input_data = FormattingInput(
+    input_data = FormattingInput.model_construct(
         purchases=[], total_savings=Decimal("25.00"), time_savings=0.0, stores=[], num_tips=3
     )
 
-    motivation = agent._generate_fallback_motivation(input_data)
+    motivation = formatter_agent._generate_fallback_motivation(input_data)
 
     assert isinstance(motivation, str)
     assert len(motivation) > 10
 
 
-def test_fallback_formatting_complete(formatting_input):
+def test_fallback_formatting_complete(formatter_agent: OutputFormatterAgent, formatting_input):
     """Test complete fallback formatting."""
-    agent = OutputFormatterAgent()
-
-    output = agent._fallback_formatting(formatting_input)
+    output = formatter_agent._fallback_formatting(formatting_input)
 
     assert isinstance(output, FormattingOutput)
     assert len(output.tips) > 0
@@ -319,16 +334,21 @@ def test_agent_initialization_without_api_key():
     assert agent.model.startswith("models/")
 
 
+def test_agent_initialization_keeps_zero_cache_ttl():
+    """Test that an explicit cache TTL of 0 is not replaced by the settings default."""
+    agent = OutputFormatterAgent(api_key="test-api-key", cache_ttl_seconds=0)
+
+    assert agent.cache_ttl_seconds == 0
+
+
 # ============================================================================
 # Helper Method Tests
 # ============================================================================
 
 
-def test_format_shopping_context(formatting_input):
+def test_format_shopping_context(formatter_agent: OutputFormatterAgent, formatting_input):
     """Test shopping context formatting for prompt."""
-    agent = OutputFormatterAgent()
-
-    context = agent._format_shopping_context(formatting_input)
+    context = formatter_agent._format_shopping_context(formatting_input)
 
     assert isinstance(context, str)
     assert "31" in context  # Total savings
@@ -337,25 +357,21 @@ def test_format_shopping_context(formatting_input):
     assert "Taco Tuesday" in context or "Pasta Carbonara" in context  # Meals
 
 
-def test_format_shopping_context_empty():
+def test_format_shopping_context_empty(formatter_agent: OutputFormatterAgent):
     """Test shopping context formatting with empty data."""
-    agent = OutputFormatterAgent()
-
-    input_data = FormattingInput(
-        purchases=[], total_savings=Decimal("0.00"), time_savings=0.0, stores=[], num_tips=3
+    input_data = FormattingInput.model_construct(
+        purchases=[], total_savings=_ZERO_SAVINGS, time_savings=0.0, stores=[], num_tips=3
     )
 
-    context = agent._format_shopping_context(input_data)
+    context = formatter_agent._format_shopping_context(input_data)
 
     assert isinstance(context, str)
     assert "0" in context  # Should show zero savings
 
 
-def test_create_prompt(formatting_input):
+def test_create_prompt(formatter_agent: OutputFormatterAgent, formatting_input):
     """Test prompt creation for Gemini."""
-    agent = OutputFormatterAgent()
-
-    prompt = agent._create_prompt(formatting_input)
+    prompt = formatter_agent._create_prompt(formatting_input)
 
     assert isinstance(prompt, str)
     assert len(prompt) > 100  # Should be substantial
@@ -364,11 +380,9 @@ def test_create_prompt(formatting_input):
     assert str(formatting_input.num_tips) in prompt
 
 
-def test_system_instruction():
+def test_system_instruction(formatter_agent: OutputFormatterAgent):
     """Test system instruction content."""
-    agent = OutputFormatterAgent()
-
-    instruction = agent._get_system_instruction()
+    instruction = formatter_agent._get_system_instruction()
 
     assert isinstance(instruction, str)
     assert len(instruction) > 50
@@ -383,22 +397,22 @@ def test_system_instruction():
 
 @pytest.mark.asyncio
 async def test_format_output_parses_valid_json(
-    monkeypatch, formatting_input: FormattingInput, mock_gemini_json_response: str
+    formatter_agent: OutputFormatterAgent,
+    monkeypatch,
+    formatting_input: FormattingInput,
+    fake_gemini_response,
 ):
     """Test that agent correctly parses valid JSON response from Gemini (HAPPY PATH)."""
     # Mock the Gemini API response
-    mock_response = MagicMock()
-    mock_response.text = mock_gemini_json_response
-    mock_response.candidates = [MagicMock()]
-    mock_response.candidates[0].content.parts = [MagicMock()]
-    mock_response.candidates[0].content.parts[0].text = mock_gemini_json_response
+    mock_response = fake_gemini_response(MOCK_GEMINI_JSON_RESPONSE)
 
     # Patch the client's generate_content method
-    agent = OutputFormatterAgent(api_key="test_key")
-    monkeypatch.setattr(agent.client.models, "generate_content", lambda **kwargs: mock_response)
+    monkeypatch.setattr(
+        formatter_agent.client.models, "generate_content", lambda **kwargs: mock_response
+    )
 
     # Act
-    output = await agent.format_output(formatting_input)
+    output = await formatter_agent.format_output(formatting_input)
 
     # Assert
     assert isinstance(output, FormattingOutput)
@@ -412,22 +426,22 @@ async def test_format_output_parses_valid_json(
 
 @pytest.mark.asyncio
 async def test_run_agent_parses_valid_json(
-    monkeypatch, formatting_input: FormattingInput, mock_gemini_json_response: str
+    formatter_agent: OutputFormatterAgent,
+    monkeypatch,
+    formatting_input: FormattingInput,
+    fake_gemini_response,
 ):
     """Test that agent.run() correctly parses valid JSON response from Gemini (HAPPY PATH)."""
     # Mock the Gemini API response
-    mock_response = MagicMock()
-    mock_response.text = mock_gemini_json_response
-    mock_response.candidates = [MagicMock()]
-    mock_response.candidates[0].content.parts = [MagicMock()]
-    mock_response.candidates[0].content.parts[0].text = mock_gemini_json_response
+    mock_response = fake_gemini_response(MOCK_GEMINI_JSON_RESPONSE)
 
     # Patch the client's generate_content method
-    agent = OutputFormatterAgent(api_key="test_key")
-    monkeypatch.setattr(agent.client.models, "generate_content", lambda **kwargs: mock_response)
+    monkeypatch.setattr(
+        formatter_agent.client.models, "generate_content", lambda **kwargs: mock_response
+    )
 
     # Act
-    output = await agent.run(formatting_input)
+    output = await formatter_agent.run(formatting_input)
 
     # Assert
     assert isinstance(output, FormattingOutput)
@@ -439,7 +453,10 @@ async def test_run_agent_parses_valid_json(
 
 @pytest.mark.asyncio
 async def test_format_output_parses_json_with_markdown(
-    monkeypatch, formatting_input: FormattingInput
+    formatter_agent: OutputFormatterAgent,
+    monkeypatch,
+    formatting_input: FormattingInput,
+    fake_gemini_response,
 ):
     """Test that agent handles JSON wrapped in markdown code blocks."""
     # Mock response with markdown code blocks
@@ -454,18 +471,15 @@ async def test_format_output_parses_json_with_markdown(
 }
 ```"""
 
-    mock_response = MagicMock()
-    mock_response.text = mock_response_text
-    mock_response.candidates = [MagicMock()]
-    mock_response.candidates[0].content.parts = [MagicMock()]
-    mock_response.candidates[0].content.parts[0].text = mock_response_text
+    mock_response = fake_gemini_response(mock_response_text)
 
     # Patch the client's generate_content method
-    agent = OutputFormatterAgent(api_key="test_key")
-    monkeypatch.setattr(agent.client.models, "generate_content", lambda **kwargs: mock_response)
+    monkeypatch.setattr(
+        formatter_agent.client.models, "generate_content", lambda **kwargs: mock_response
+    )
 
     # Act
-    output = await agent.format_output(formatting_input)
+    output = await formatter_agent.format_output(formatting_input)
 
     # Assert
     assert isinstance(output, FormattingOutput)
@@ -476,43 +490,43 @@ async def test_format_output_parses_json_with_markdown(
 
 @pytest.mark.asyncio
 async def test_format_output_invalid_json_triggers_fallback(
-    monkeypatch, formatting_input: FormattingInput, mock_gemini_invalid_json_response: str
+    formatter_agent: OutputFormatterAgent,
+    monkeypatch,
+    formatting_input: FormattingInput,
+    fake_gemini_response,
 ):
     """Test that invalid JSON response triggers fallback logic."""
     # Mock the Gemini API response with invalid JSON
-    mock_response = MagicMock()
-    mock_response.text = mock_gemini_invalid_json_response
-    mock_response.candidates = [MagicMock()]
-    mock_response.candidates[0].content.parts = [MagicMock()]
-    mock_response.candidates[0].content.parts[0].text = mock_gemini_invalid_json_response
+    mock_response = fake_gemini_response(MOCK_GEMINI_INVALID_JSON_RESPONSE)
 
     # Patch the client's generate_content method
-    agent = OutputFormatterAgent(api_key="test_key")
-    monkeypatch.setattr(agent.client.models, "generate_content", lambda **kwargs: mock_response)
+    monkeypatch.setattr(
+        formatter_agent.client.models, "generate_content", lambda **kwargs: mock_response
+    )
 
     # Act - should raise ValueError which triggers fallback in run()
     with pytest.raises(ValueError, match="Failed to parse Gemini response"):
-        await agent.format_output(formatting_input)
+        await formatter_agent.format_output(formatting_input)
 
 
 @pytest.mark.asyncio
 async def test_run_agent_invalid_json_triggers_fallback(
-    monkeypatch, formatting_input: FormattingInput, mock_gemini_invalid_json_response: str
+    formatter_agent: OutputFormatterAgent,
+    monkeypatch,
+    formatting_input: FormattingInput,
+    fake_gemini_response,
 ):
     """Test that agent.run() falls back gracefully when JSON parsing fails."""
     # Mock the Gemini API response with invalid JSON
-    mock_response = MagicMock()
-    mock_response.text = mock_gemini_invalid_json_response
-    mock_response.candidates = [MagicMock()]
-    mock_response.candidates[0].content.parts = [MagicMock()]
-    mock_response.candidates[0].content.parts[0].text = mock_gemini_invalid_json_response
+    mock_response = fake_gemini_response(MOCK_GEMINI_INVALID_JSON_RESPONSE)
 
     # Patch the client's generate_content method
-    agent = OutputFormatterAgent(api_key="test_key")
-    monkeypatch.setattr(agent.client.models, "generate_content", lambda **kwargs: mock_response)
+    monkeypatch.setattr(
+        formatter_agent.client.models, "generate_content", lambda **kwargs: mock_response
+    )
 
     # Act - run() should catch the error and use fallback
-    output = await agent.run(formatting_input)
+    output = await formatter_agent.run(formatting_input)
 
     # Assert - should get fallback output
     assert isinstance(output, FormattingOutput)
@@ -524,7 +538,10 @@ async def test_run_agent_invalid_json_triggers_fallback(
 
 @pytest.mark.asyncio
 async def test_format_output_fewer_tips_than_requested(
-    monkeypatch, formatting_input: FormattingInput
+    formatter_agent: OutputFormatterAgent,
+    monkeypatch,
+    formatting_input: FormattingInput,
+    fake_gemini_response,
 ):
     """Test that agent handles response with fewer tips than requested."""
     # Mock response with only 2 tips (requested 5)
@@ -536,18 +553,15 @@ async def test_format_output_fewer_tips_than_requested(
     "motivation_message": "Good job planning ahead!"
 }"""
 
-    mock_response = MagicMock()
-    mock_response.text = mock_response_text
-    mock_response.candidates = [MagicMock()]
-    mock_response.candidates[0].content.parts = [MagicMock()]
-    mock_response.candidates[0].content.parts[0].text = mock_response_text
+    mock_response = fake_gemini_response(mock_response_text)
 
     # Patch the client's generate_content method
-    agent = OutputFormatterAgent(api_key="test_key")
-    monkeypatch.setattr(agent.client.models, "generate_content", lambda **kwargs: mock_response)
+    monkeypatch.setattr(
+        formatter_agent.client.models, "generate_content", lambda **kwargs: mock_response
+    )
 
     # Act
-    output = await agent.format_output(formatting_input)
+    output = await formatter_agent.format_output(formatting_input)
 
     # Assert - should accept fewer tips
     assert isinstance(output, FormattingOutput)
@@ -555,5 +569,135 @@ async def test_format_output_fewer_tips_than_requested(
     assert output.tips[0] == "Tip 1"
 
 
+@pytest.mark.parametrize("orjson_available", [True, False], ids=["orjson", "stdlib_json"])
+def test_parse_response_json_backends(
+    formatter_agent: OutputFormatterAgent,
+    monkeypatch,
+    formatting_input: FormattingInput,
+    orjson_available: bool,
+):
+    """Test that responses parse identically with orjson and the stdlib fallback."""
+    if orjson_available and not output_formatter_agent.ORJSON_AVAILABLE:
+        pytest.skip("orjson not installed")
+    monkeypatch.setattr(output_formatter_agent, "ORJSON_AVAILABLE", orjson_available)
+
+    output = formatter_agent._parse_response(MOCK_GEMINI_JSON_RESPONSE, formatting_input)
+    assert len(output.tips) == 5
+    assert "31 kr" in output.motivation_message
+
+    with pytest.raises(ValueError, match="Failed to parse Gemini response"):
+        formatter_agent._parse_response(MOCK_GEMINI_INVALID_JSON_RESPONSE, formatting_input)
+
+
+def test_parse_response_ignores_surrounding_prose(
+    formatter_agent: OutputFormatterAgent, formatting_input: FormattingInput
+):
+    """Test that JSON embedded in prose and markdown fences is still extracted."""
+    response_text = f"Here is your plan:\n```json\n{MOCK_GEMINI_JSON_RESPONSE}\n```\nEnjoy!"
+
+    output = formatter_agent._parse_response(response_text, formatting_input)
+
+    assert len(output.tips) == 5
+    assert output.tips[0] == "Shop early in the morning for the freshest products"
+
+
+@pytest.mark.asyncio
+async def test_run_agent_caches_gemini_output(
+    monkeypatch, formatting_input: FormattingInput, fake_gemini_response
+):
+    """Test that repeated identical inputs are served from cache without calling Gemini."""
+    agent = OutputFormatterAgent(api_key="test_key", cache_repository=InMemoryCacheRepository())
+    calls = []
+
+    def mock_generate(**kwargs):
+        calls.append(kwargs)
+        return fake_gemini_response(MOCK_GEMINI_JSON_RESPONSE)
+
+    monkeypatch.setattr(agent.client.models, "generate_content", mock_generate)
+
+    first = await agent.run(formatting_input)
+    second = await agent.run(formatting_input)
+
+    assert len(calls) == 1
+    assert second == first
+    assert second.tips[0] == "Shop early in the morning for the freshest products"
+
+
+@pytest.mark.asyncio
+async def test_run_agent_zero_cache_ttl_skips_cache(
+    monkeypatch, formatting_input: FormattingInput, fake_gemini_response
+):
+    """Test that a cache TTL of 0 disables caching instead of writing entries that expire at once."""
+    cache = InMemoryCacheRepository()
+    agent = OutputFormatterAgent(api_key="test_key", cache_repository=cache, cache_ttl_seconds=0)
+    calls = []
+
+    def mock_generate(**kwargs):
+        calls.append(kwargs)
+        return fake_gemini_response(MOCK_GEMINI_JSON_RESPONSE)
+
+    monkeypatch.setattr(agent.client.models, "generate_content", mock_generate)
+
+    await agent.run(formatting_input)
+    await agent.run(formatting_input)
+
+    assert len(calls) == 2
+    assert await cache.get_size() == 0
+
+
+@pytest.mark.asyncio
+async def test_run_agent_does_not_cache_fallback(
+    monkeypatch, formatting_input: FormattingInput, fake_gemini_response
+):
+    """Test that fallback output is not cached, so a later Gemini call can succeed."""
+    agent = OutputFormatterAgent(api_key="test_key", cache_repository=InMemoryCacheRepository())
+    monkeypatch.setattr(
+        agent.client.models,
+        "generate_content",
+        lambda **kwargs: fake_gemini_response(MOCK_GEMINI_INVALID_JSON_RESPONSE),
+    )
+    await agent.run(formatting_input)
+
+    monkeypatch.setattr(
+        agent.client.models,
+        "generate_content",
+        lambda **kwargs: fake_gemini_response(MOCK_GEMINI_JSON_RESPONSE),
+    )
+    output = await agent.run(formatting_input)
+
+    assert output.tips[0] == "Shop early in the morning for the freshest products"
+
+
+@pytest.mark.asyncio
+async def test_run_agent_ignores_stale_schema_cache_entry(
+    monkeypatch, formatting_input: FormattingInput, fake_gemini_response
+):
+    """Test that entries cached under another schema version are treated as misses."""
+    agent = OutputFormatterAgent(api_key="test_key", cache_repository=InMemoryCacheRepository())
+    monkeypatch.setattr(
+        agent.client.models,
+        "generate_content",
+        lambda **kwargs: fake_gemini_response(MOCK_GEMINI_JSON_RESPONSE),
+    )
+    first = await agent.run(formatting_input)
+
+    monkeypatch.setattr(
+        output_formatter_agent,
+        "FORMATTING_OUTPUT_SCHEMA_VERSION",
+        output_formatter_agent.FORMATTING_OUTPUT_SCHEMA_VERSION + 1,
+    )
+    calls = []
+
+    def mock_generate(**kwargs):
+        calls.append(kwargs)
+        return fake_gemini_response(MOCK_GEMINI_JSON_RESPONSE)
+
+    monkeypatch.setattr(agent.client.models, "generate_content", mock_generate)
+    second = await agent.run(formatting_input)
+
+    assert len(calls) == 1
+    assert second == first
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
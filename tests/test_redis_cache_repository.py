@@ -5,7 +5,7 @@ This module tests the RedisCacheRepository implementation with both
 real Redis connections (if available) and mock scenarios.
 """
 
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
@@ -17,8 +17,12 @@ from agents.discount_optimizer.infrastructure.redis_cache_repository import (
 )
 
 
-# Skip all tests if Redis is not installed
-pytestmark = pytest.mark.skipif(not REDIS_AVAILABLE, reason="redis package not installed")
+# Skip all tests if Redis is not installed. fakeredis flags SETEX as deprecated
+# in favour of SET EX, but it is still the real Redis command the repository uses.
+pytestmark = [
+    pytest.mark.skipif(not REDIS_AVAILABLE, reason="redis package not installed"),
+    pytest.mark.filterwarnings("ignore:Call to deprecated setex:DeprecationWarning"),
+]
 
 
 @pytest.fixture
@@ -70,6 +74,24 @@ def redis_cache(mock_redis_client, mock_redis_pool):
         yield cache
 
 
+@pytest.fixture
+def fake_redis():
+    """In-process Redis with real command semantics (SCAN cursors, UNLINK, TTLs)."""
+    fakeredis_aioredis = pytest.importorskip("fakeredis.aioredis")
+    return fakeredis_aioredis.FakeRedis(decode_responses=False)
+
+
+@pytest.fixture
+def fake_redis_cache(fake_redis, redis_cache):
+    """RedisCacheRepository backed by fakeredis instead of a mocked client.
+
+    fake_redis is requested first so fakeredis is imported before redis_cache
+    patches ``redis.asyncio.Redis``, which fakeredis subclasses.
+    """
+    redis_cache._client = fake_redis
+    return redis_cache
+
+
 class TestRedisCacheMetrics:
     """Test RedisCacheMetrics dataclass."""
 
@@ -134,104 +156,110 @@ class TestRedisCacheRepository:
     """Test RedisCacheRepository implementation."""
 
     @pytest.mark.asyncio
-    async def test_get_cache_miss(self, redis_cache, mock_redis_client):
+    async def test_get_cache_miss(self, fake_redis_cache):
         """Test getting a non-existent key returns None."""
-        mock_redis_client.get.return_value = None
-
-        result = await redis_cache.get("nonexistent_key")
+        result = await fake_redis_cache.get("nonexistent_key")
 
         assert result is None
-        assert redis_cache.get_metrics().misses == 1
-        assert redis_cache.get_metrics().hits == 0
-        mock_redis_client.get.assert_called_once_with("test:nonexistent_key")
+        assert fake_redis_cache.get_metrics().misses == 1
+        assert fake_redis_cache.get_metrics().hits == 0
 
     @pytest.mark.asyncio
-    async def test_get_cache_hit(self, redis_cache, mock_redis_client):
+    async def test_get_cache_hit(self, fake_redis_cache, fake_redis):
         """Test getting an existing key returns the value."""
         test_value = b"test_data"
-        mock_redis_client.get.return_value = test_value
+        await fake_redis.set("test:test_key", test_value)
 
-        result = await redis_cache.get("test_key")
+        result = await fake_redis_cache.get("test_key")
 
         assert result == test_value
-        assert redis_cache.get_metrics().hits == 1
-        assert redis_cache.get_metrics().misses == 0
-        mock_redis_client.get.assert_called_once_with("test:test_key")
+        assert fake_redis_cache.get_metrics().hits == 1
+        assert fake_redis_cache.get_metrics().misses == 0
 
     @pytest.mark.asyncio
-    async def test_set_cache(self, redis_cache, mock_redis_client):
-        """Test setting a cache value."""
+    async def test_set_cache(self, fake_redis_cache, fake_redis):
+        """Test setting a cache value stores it with the requested TTL."""
         test_value = b"test_data"
         ttl = 3600
 
-        await redis_cache.set("test_key", test_value, ttl)
+        await fake_redis_cache.set("test_key", test_value, ttl)
 
-        assert redis_cache.get_metrics().sets == 1
-        mock_redis_client.setex.assert_called_once_with(
-            name="test:test_key", time=ttl, value=test_value
-        )
+        assert fake_redis_cache.get_metrics().sets == 1
+        assert await fake_redis.get("test:test_key") == test_value
+        assert 0 < await fake_redis.ttl("test:test_key") <= ttl
 
     @pytest.mark.asyncio
-    async def test_delete_existing_key(self, redis_cache, mock_redis_client):
+    async def test_set_then_get_round_trip(self, fake_redis_cache):
+        """Test that a value written through the repository reads back unchanged."""
+        await fake_redis_cache.set("round_trip", b"\x00\x01payload", 60)
+
+        assert await fake_redis_cache.get("round_trip") == b"\x00\x01payload"
+
+    @pytest.mark.asyncio
+    async def test_delete_existing_key(self, fake_redis_cache, fake_redis):
         """Test deleting an existing key."""
-        mock_redis_client.delete.return_value = 1
+        await fake_redis.set("test:test_key", b"value")
 
-        result = await redis_cache.delete("test_key")
+        result = await fake_redis_cache.delete("test_key")
 
         assert result is True
-        assert redis_cache.get_metrics().deletes == 1
-        mock_redis_client.delete.assert_called_once_with("test:test_key")
+        assert fake_redis_cache.get_metrics().deletes == 1
+        assert await fake_redis.exists("test:test_key") == 0
 
     @pytest.mark.asyncio
-    async def test_delete_nonexistent_key(self, redis_cache, mock_redis_client):
+    async def test_delete_nonexistent_key(self, fake_redis_cache):
         """Test deleting a non-existent key."""
-        mock_redis_client.delete.return_value = 0
-
-        result = await redis_cache.delete("nonexistent_key")
+        result = await fake_redis_cache.delete("nonexistent_key")
 
         assert result is False
-        assert redis_cache.get_metrics().deletes == 1
+        assert fake_redis_cache.get_metrics().deletes == 1
 
     @pytest.mark.asyncio
-    async def test_clear_cache(self, redis_cache, mock_redis_client):
-        """Test clearing all cache entries with prefix."""
-        # Mock SCAN to return some keys
-        mock_redis_client.scan.side_effect = [
-            (1, [b"test:key1", b"test:key2"]),
-            (0, [b"test:key3"]),
-        ]
-        mock_redis_client.delete.return_value = 3
-
-        await redis_cache.clear()
-
-        # Should call scan twice (cursor 0 means done)
-        assert mock_redis_client.scan.call_count == 2
-        # Should delete all found keys
-        assert mock_redis_client.delete.call_count == 2
+    async def test_clear_cache(self, fake_redis_cache, fake_redis):
+        """Test clearing UNLINKs every prefixed entry on one pipeline and keeps the rest."""
+        for i in range(2500):  # More than one SCAN batch
+            await fake_redis.set(f"test:key{i}", b"value")
+        await fake_redis.set("other:key", b"value")
+
+        pipelines = []
+        create_pipeline = fake_redis.pipeline
+
+        def spy_pipeline(*args, **kwargs):
+            pipe = create_pipeline(*args, **kwargs)
+            pipe.unlink = MagicMock(wraps=pipe.unlink)
+            pipe.delete = MagicMock(wraps=pipe.delete)
+            pipelines.append(pipe)
+            return pipe
+
+        with (
+            patch.object(fake_redis, "pipeline", MagicMock(side_effect=spy_pipeline)) as pipeline,
+            patch.object(fake_redis, "delete", wraps=fake_redis.delete) as delete,
+        ):
+            await fake_redis_cache.clear()
+
+        pipeline.assert_called_once_with(transaction=False)
+        (pipe,) = pipelines
+        assert pipe.unlink.call_count >= 1
+        pipe.delete.assert_not_called()
+        delete.assert_not_called()
+        assert await fake_redis.keys("*") == [b"other:key"]
 
     @pytest.mark.asyncio
-    async def test_get_size(self, redis_cache, mock_redis_client):
-        """Test getting cache size."""
-        # Mock SCAN to return keys
-        mock_redis_client.scan.side_effect = [
-            (1, [b"test:key1", b"test:key2"]),
-            (0, [b"test:key3"]),
-        ]
+    async def test_get_size(self, fake_redis_cache, fake_redis):
+        """Test getting cache size counts only prefixed entries."""
+        for key in ("test:key1", "test:key2", "test:key3", "other:key"):
+            await fake_redis.set(key, b"value")
 
-        size = await redis_cache.get_size()
+        size = await fake_redis_cache.get_size()
 
         assert size == 3
-        assert mock_redis_client.scan.call_count == 2
 
     @pytest.mark.asyncio
-    async def test_health_check_success(self, redis_cache, mock_redis_client):
+    async def test_health_check_success(self, fake_redis_cache):
         """Test health check with successful ping."""
-        mock_redis_client.ping.return_value = True
-
-        is_healthy = await redis_cache.health_check()
+        is_healthy = await fake_redis_cache.health_check()
 
         assert is_healthy is True
-        mock_redis_client.ping.assert_called_once()
 
     @pytest.mark.asyncio
     async def test_health_check_failure(self, redis_cache, mock_redis_client):
@@ -247,14 +275,11 @@ class TestRedisCacheRepository:
         assert redis_cache.get_metrics().connection_errors == 1
 
     @pytest.mark.asyncio
-    async def test_key_prefix(self, redis_cache, mock_redis_client):
+    async def test_key_prefix(self, fake_redis_cache, fake_redis):
         """Test that key prefix is applied correctly."""
-        await redis_cache.set("mykey", b"value", 60)
+        await fake_redis_cache.set("mykey", b"value", 60)
 
-        # Should call with prefixed key
-        mock_redis_client.setex.assert_called_once()
-        call_args = mock_redis_client.setex.call_args
-        assert call_args[1]["name"] == "test:mykey"
+        assert await fake_redis.keys("*") == [b"test:mykey"]
 
     @pytest.mark.asyncio
     async def test_context_manager(self, redis_cache, mock_redis_client, mock_redis_pool):
@@ -4,17 +4,41 @@ This test suite verifies the repository implementation without making real
 network calls. All HTTP responses are mocked using pytest-httpx.
 """
 
+import re
+from collections.abc import AsyncIterator
 from datetime import date
 from decimal import Decimal
 from typing import Any
 
 import httpx
 import pytest
+import pytest_asyncio
 
 from agents.discount_optimizer.domain.exceptions import APIError, ValidationError
 from agents.discount_optimizer.domain.models import Location
 from agents.discount_optimizer.domain.protocols import DiscountRepository
-from agents.discount_optimizer.infrastructure.salling_repository import SallingDiscountRepository
+from agents.discount_optimizer.infrastructure import salling_repository
+from agents.discount_optimizer.infrastructure.salling_repository import (
+    SallingDiscountRepository,
+    _decimal_cached,
+)
+
+
+# Keep every test sharing the module-scoped repository on one xdist worker.
+pytestmark = pytest.mark.xdist_group("salling_repository")
+
+_FOOD_WASTE_URL = re.compile(r"https://api\.sallinggroup\.com/v1/food-waste/\?.*")
+
+# Exact food-waste URLs for the test location, built once and keyed by radius.
+_FOOD_WASTE_URLS = {
+    radius: f"https://api.sallinggroup.com/v1/food-waste/?geo=55.6761%2C12.5683&radius={radius}"
+    for radius in (1.0, 5.0)
+}
+
+
+def _mock_salling(httpx_mock, *, radius: float = 5.0, **response: Any) -> None:
+    """Register one food-waste response for the test location at ``radius``."""
+    httpx_mock.add_response(url=_FOOD_WASTE_URLS[radius], **response)
 
 
 # ============================================================================
@@ -82,6 +106,42 @@ def mock_api_response() -> list[dict[str, Any]]:
     ]
 
 
+@pytest.fixture
+def salling_router(httpx_mock, mock_api_response: list[dict[str, Any]]):
+    """Answer every food-waste query with mock_api_response via one reusable callback.
+
+    Happy-path tests assert on the recorded query string instead of registering
+    an exact URL per call.
+    """
+    httpx_mock.add_callback(
+        lambda request: httpx.Response(200, json=mock_api_response),
+        url=_FOOD_WASTE_URL,
+        is_reusable=True,
+    )
+    return httpx_mock
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def shared_repo() -> AsyncIterator[SallingDiscountRepository]:
+    """One repository, and so one pooled AsyncClient, for the whole module.
+
+    pytest-httpx patches the transport class per test, so responses stay
+    isolated even though the client outlives each test.
+    """
+    async with SallingDiscountRepository(api_key="test_key") as repo:
+        yield repo
+
+
+@pytest.fixture
+def repo(shared_repo: SallingDiscountRepository) -> SallingDiscountRepository:
+    """The module's shared repository with its response cache emptied for this test.
+
+    Tests using it must run on the module loop: @pytest.mark.asyncio(loop_scope="module").
+    """
+    shared_repo._response_cache.clear()
+    return shared_repo
+
+
 @pytest.fixture
 def test_location() -> Location:
     """Fixture providing a test location (Copenhagen center)."""
@@ -117,6 +177,43 @@ def test_repository_initialization_without_api_key_raises_error(monkeypatch):
         SallingDiscountRepository()
 
 
+@pytest.mark.parametrize(
+    ("connect_timeout", "api_timeout", "expected"), [(2.0, 30, 2.0), (5.0, 1, 1.0)]
+)
+def test_repository_connect_timeout_capped_by_api_timeout(
+    monkeypatch, connect_timeout: float, api_timeout: int, expected: float
+):
+    """Test that the connect timeout comes from settings but never exceeds the API timeout."""
+    monkeypatch.setattr(salling_repository.settings, "api_connect_timeout_seconds", connect_timeout)
+    monkeypatch.setattr(salling_repository.settings, "api_timeout_seconds", api_timeout)
+
+    repo = SallingDiscountRepository(api_key="test_key")
+
+    assert repo._client.timeout.connect == expected
+    assert repo._client.timeout.read == api_timeout
+
+
+@pytest.mark.asyncio
+async def test_repository_uses_injected_transport(
+    mock_api_response: list[dict[str, Any]], test_location: Location
+):
+    """Test that an injected transport carries requests from the owned client."""
+    seen: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        return httpx.Response(200, json=mock_api_response)
+
+    async with SallingDiscountRepository(
+        api_key="test_key", transport=httpx.MockTransport(handler)
+    ) as repo:
+        discounts = await repo.fetch_discounts(test_location, radius_km=5.0)
+
+    assert len(discounts) == 3
+    (request,) = seen
+    assert request.headers["Authorization"] == "Bearer test_key"
+
+
 def test_repository_implements_protocol():
     """Test that repository correctly implements DiscountRepository protocol."""
     repo = SallingDiscountRepository(api_key="test_key")
@@ -130,20 +227,14 @@ def test_repository_implements_protocol():
 # ============================================================================
 
 
-@pytest.mark.asyncio
-async def test_fetch_discounts_success(
-    httpx_mock, mock_api_response: list[dict[str, Any]], test_location: Location
-):
+@pytest.mark.asyncio(loop_scope="module")
+async def test_fetch_discounts_success(repo, salling_router, test_location: Location):
     """Test successful discount fetching with mocked HTTP response."""
-    # Mock the HTTP response
-    httpx_mock.add_response(
-        url="https://api.sallinggroup.com/v1/food-waste/?geo=55.6761%2C12.5683&radius=5.0",
-        json=mock_api_response,
-        status_code=200,
-    )
+    discounts = await repo.fetch_discounts(test_location, radius_km=5.0)
 
-    async with SallingDiscountRepository(api_key="test_key") as repo:
-        discounts = await repo.fetch_discounts(test_location, radius_km=5.0)
+    # Verify the query string sent to the API
+    (request,) = salling_router.get_requests()
+    assert dict(request.url.params) == {"geo": "55.6761,12.5683", "radius": "5.0"}
 
     # Verify we got the expected number of discounts
     assert len(discounts) == 3  # 2 from Netto + 1 from Føtex
@@ -152,6 +243,7 @@ async def test_fetch_discounts_success(
     first = discounts[0]
     assert first.product_name == "Økologisk Mælk 1L"
     assert first.store_name == "Netto København K"
+    assert first.store_address == "Nørrebrogade 20, København K"
     assert first.original_price == Decimal("25.00")
     assert first.discount_price == Decimal("18.75")
     assert first.discount_percent == 25.0
@@ -163,97 +255,165 @@ async def test_fetch_discounts_success(
     assert first.store_location.longitude == 12.5683
 
 
-@pytest.mark.asyncio
-async def test_fetch_discounts_caps_radius(
-    httpx_mock, mock_api_response: list[dict[str, Any]], test_location: Location
-):
+@pytest.mark.asyncio(loop_scope="module")
+async def test_fetch_discounts_caps_radius(repo, salling_router, test_location: Location):
     """Test that radius is capped at 100km per API limits."""
-    # Mock expects radius=100.0 (capped)
-    httpx_mock.add_response(
-        url="https://api.sallinggroup.com/v1/food-waste/?geo=55.6761%2C12.5683&radius=100.0",
-        json=mock_api_response,
-        status_code=200,
-    )
+    # Request 150km but should be capped at 100km
+    discounts = await repo.fetch_discounts(test_location, radius_km=150.0)
+
+    assert len(discounts) == 3
+    (request,) = salling_router.get_requests()
+    assert request.url.params["radius"] == "100.0"
+
+
+@pytest.mark.asyncio
+async def test_fetch_discounts_reuses_client(salling_router, monkeypatch, test_location: Location):
+    """Test that sequential fetches share one pooled HTTP/2-capable keep-alive client."""
+    created: list[dict[str, Any]] = []
+    original_init = httpx.AsyncClient.__init__
+
+    def spy_init(self: httpx.AsyncClient, **kwargs: Any) -> None:
+        created.append(kwargs)
+        original_init(self, **kwargs)
+
+    monkeypatch.setattr(httpx.AsyncClient, "__init__", spy_init)
 
     async with SallingDiscountRepository(api_key="test_key") as repo:
-        # Request 150km but should be capped at 100km
-        discounts = await repo.fetch_discounts(test_location, radius_km=150.0)
+        await repo.fetch_discounts(test_location, radius_km=5.0)
+        await repo.fetch_discounts(test_location, radius_km=10.0)
 
-    assert len(discounts) == 3
+    (client_kwargs,) = created
+    assert client_kwargs["http2"] is salling_repository.HTTP2_AVAILABLE
+    limits = client_kwargs["limits"]
+    assert limits.max_keepalive_connections == salling_repository.settings.max_concurrent_requests
+    assert limits.keepalive_expiry == 30.0
+    assert [r.url.params["radius"] for r in salling_router.get_requests()] == ["5.0", "10.0"]
+
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_fetch_discounts_cache_hit(repo, salling_router, test_location: Location):
+    """Test that an identical location/radius query is served from the response cache."""
+    first = await repo.fetch_discounts(test_location, radius_km=5.0)
+    second = await repo.fetch_discounts(test_location, radius_km=5.0)
+
+    assert second == first
+    assert second is not first
+    assert len(salling_router.get_requests()) == 1
 
 
 @pytest.mark.asyncio
-async def test_fetch_discounts_empty_response(httpx_mock, test_location: Location):
-    """Test handling of empty API response (no discounts available)."""
-    httpx_mock.add_response(
-        url="https://api.sallinggroup.com/v1/food-waste/?geo=55.6761%2C12.5683&radius=5.0",
-        json=[],
-        status_code=200,
-    )
+async def test_fetch_discounts_cache_expires(
+    httpx_mock, monkeypatch, mock_api_response: list[dict[str, Any]], test_location: Location
+):
+    """Test that cached responses are refetched once their TTL has passed."""
+    _mock_salling(httpx_mock, json=mock_api_response)
+    _mock_salling(httpx_mock, json=[])
+
+    now = 1000.0
+    monkeypatch.setattr(salling_repository.time, "monotonic", lambda: now)
 
     async with SallingDiscountRepository(api_key="test_key") as repo:
-        discounts = await repo.fetch_discounts(test_location, radius_km=5.0)
+        assert len(await repo.fetch_discounts(test_location, radius_km=5.0)) == 3
+
+        now += salling_repository.RESPONSE_CACHE_TTL_SECONDS
+        assert await repo.fetch_discounts(test_location, radius_km=5.0) == []
+
+    assert len(httpx_mock.get_requests()) == 2
+
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_fetch_discounts_empty_response(repo, httpx_mock, test_location: Location):
+    """Test handling of empty API response (no discounts available)."""
+    _mock_salling(httpx_mock, json=[])
+
+    discounts = await repo.fetch_discounts(test_location, radius_km=5.0)
 
     assert discounts == []
 
 
+@pytest.mark.parametrize("orjson_available", [True, False], ids=["orjson", "stdlib_json"])
+@pytest.mark.asyncio(loop_scope="module")
+async def test_fetch_discounts_json_backends(
+    repo, salling_router, monkeypatch, test_location: Location, orjson_available: bool
+):
+    """Test that responses decode identically with orjson and the stdlib fallback."""
+    if orjson_available and not salling_repository.ORJSON_AVAILABLE:
+        pytest.skip("orjson not installed")
+    monkeypatch.setattr(salling_repository, "ORJSON_AVAILABLE", orjson_available)
+
+    discounts = await repo.fetch_discounts(test_location, radius_km=5.0)
+
+    assert len(discounts) == 3
+    assert discounts[0].discount_price == Decimal("18.75")
+
+
 # ============================================================================
 # Test: Fetch Discounts (Error Cases)
 # ============================================================================
 
 
-@pytest.mark.asyncio
-async def test_fetch_discounts_rate_limited(httpx_mock, test_location: Location):
+@pytest.mark.asyncio(loop_scope="module")
+async def test_fetch_discounts_rate_limited(repo, httpx_mock, test_location: Location):
     """Test handling of API rate limiting (429 status)."""
-    httpx_mock.add_response(
-        url="https://api.sallinggroup.com/v1/food-waste/?geo=55.6761%2C12.5683&radius=5.0",
+    _mock_salling(
+        httpx_mock,
         status_code=429,
         headers={"Retry-After": "60"},
         text="Rate limit exceeded",
     )
 
-    async with SallingDiscountRepository(api_key="test_key") as repo:
-        with pytest.raises(APIError, match="API rate limit exceeded"):
-            await repo.fetch_discounts(test_location, radius_km=5.0)
+    with pytest.raises(APIError, match="API rate limit exceeded"):
+        await repo.fetch_discounts(test_location, radius_km=5.0)
 
 
-@pytest.mark.asyncio
-async def test_fetch_discounts_http_error(httpx_mock, test_location: Location):
+@pytest.mark.asyncio(loop_scope="module")
+async def test_fetch_discounts_http_error(repo, httpx_mock, test_location: Location):
     """Test handling of HTTP errors (4xx, 5xx)."""
-    httpx_mock.add_response(
-        url="https://api.sallinggroup.com/v1/food-waste/?geo=55.6761%2C12.5683&radius=5.0",
-        status_code=500,
-        text="Internal Server Error",
-    )
+    _mock_salling(httpx_mock, status_code=500, text="Internal Server Error")
 
-    async with SallingDiscountRepository(api_key="test_key") as repo:
-        with pytest.raises(APIError, match="API request failed with status 500"):
-            await repo.fetch_discounts(test_location, radius_km=5.0)
+    with pytest.raises(APIError, match="API request failed with status 500"):
+        await repo.fetch_discounts(test_location, radius_km=5.0)
 
 
-@pytest.mark.asyncio
-async def test_fetch_discounts_timeout(httpx_mock, test_location: Location):
+@pytest.mark.asyncio(loop_scope="module")
+async def test_fetch_discounts_timeout(repo, httpx_mock, test_location: Location):
     """Test handling of request timeout."""
     httpx_mock.add_exception(httpx.TimeoutException("Request timed out"))
 
-    async with SallingDiscountRepository(api_key="test_key") as repo:
-        with pytest.raises(APIError, match="API request timed out"):
-            await repo.fetch_discounts(test_location, radius_km=5.0)
+    with pytest.raises(APIError, match="API request timed out"):
+        await repo.fetch_discounts(test_location, radius_km=5.0)
 
 
-@pytest.mark.asyncio
-async def test_fetch_discounts_invalid_json_response(httpx_mock, test_location: Location):
+@pytest.mark.asyncio(loop_scope="module")
+async def test_fetch_discounts_invalid_json_response(repo, httpx_mock, test_location: Location):
     """Test handling of invalid JSON response structure."""
     # Return a dict instead of expected list
-    httpx_mock.add_response(
-        url="https://api.sallinggroup.com/v1/food-waste/?geo=55.6761%2C12.5683&radius=5.0",
-        json={"error": "Invalid response"},
-        status_code=200,
-    )
+    _mock_salling(httpx_mock, json={"error": "Invalid response"})
 
-    async with SallingDiscountRepository(api_key="test_key") as repo:
-        with pytest.raises(ValidationError, match="Expected list response"):
-            await repo.fetch_discounts(test_location, radius_km=5.0)
+    with pytest.raises(ValidationError, match="Expected list response"):
+        await repo.fetch_discounts(test_location, radius_km=5.0)
+
+
+# ============================================================================
+# Test: Price Conversion
+# ============================================================================
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [(25.0, "25.0"), (18.75, "18.75"), (19.95, "19.95"), (10, "10")],
+)
+def test_decimal_cached_matches_str_conversion(value: float, expected: str):
+    """Test that cached conversion keeps the Decimal(str(value)) semantics."""
+    result = _decimal_cached(value)
+
+    assert result == Decimal(expected)
+    assert str(result) == expected
+
+
+def test_decimal_cached_reuses_instances():
+    """Test that repeated prices return the same immutable Decimal instance."""
+    assert _decimal_cached(19.95) is _decimal_cached(19.95)
 
 
 # ============================================================================
@@ -261,42 +421,32 @@ async def test_fetch_discounts_invalid_json_response(httpx_mock, test_location:
 # ============================================================================
 
 
-@pytest.mark.asyncio
-async def test_health_check_success(httpx_mock):
+@pytest.mark.asyncio(loop_scope="module")
+async def test_health_check_success(repo, httpx_mock):
     """Test successful health check."""
-    httpx_mock.add_response(
-        url="https://api.sallinggroup.com/v1/food-waste/?geo=55.6761%2C12.5683&radius=1.0",
-        json=[],
-        status_code=200,
-    )
+    _mock_salling(httpx_mock, radius=1.0, json=[])
 
-    async with SallingDiscountRepository(api_key="test_key") as repo:
-        is_healthy = await repo.health_check()
+    is_healthy = await repo.health_check()
 
     assert is_healthy is True
 
 
-@pytest.mark.asyncio
-async def test_health_check_failure(httpx_mock):
+@pytest.mark.asyncio(loop_scope="module")
+async def test_health_check_failure(repo, httpx_mock):
     """Test health check when API is down."""
-    httpx_mock.add_response(
-        url="https://api.sallinggroup.com/v1/food-waste/?geo=55.6761%2C12.5683&radius=1.0",
-        status_code=503,
-    )
+    _mock_salling(httpx_mock, radius=1.0, status_code=503)
 
-    async with SallingDiscountRepository(api_key="test_key") as repo:
-        is_healthy = await repo.health_check()
+    is_healthy = await repo.health_check()
 
     assert is_healthy is False
 
 
-@pytest.mark.asyncio
-async def test_health_check_exception(httpx_mock):
+@pytest.mark.asyncio(loop_scope="module")
+async def test_health_check_exception(repo, httpx_mock):
     """Test health check when network error occurs."""
     httpx_mock.add_exception(httpx.ConnectError("Connection refused"))
 
-    async with SallingDiscountRepository(api_key="test_key") as repo:
-        is_healthy = await repo.health_check()
+    is_healthy = await repo.health_check()
 
     assert is_healthy is False
 
@@ -324,8 +474,8 @@ async def test_context_manager_cleanup():
 # ============================================================================
 
 
-@pytest.mark.asyncio
-async def test_parse_discount_missing_coordinates(httpx_mock, test_location: Location):
+@pytest.mark.asyncio(loop_scope="module")
+async def test_parse_discount_missing_coordinates(repo, httpx_mock, test_location: Location):
     """Test that stores without coordinates are skipped."""
     response = [
         {
@@ -349,21 +499,16 @@ async def test_parse_discount_missing_coordinates(httpx_mock, test_location: Loc
         }
     ]
 
-    httpx_mock.add_response(
-        url="https://api.sallinggroup.com/v1/food-waste/?geo=55.6761%2C12.5683&radius=5.0",
-        json=response,
-        status_code=200,
-    )
+    _mock_salling(httpx_mock, json=response)
 
-    async with SallingDiscountRepository(api_key="test_key") as repo:
-        discounts = await repo.fetch_discounts(test_location, radius_km=5.0)
+    discounts = await repo.fetch_discounts(test_location, radius_km=5.0)
 
     # Store should be skipped due to missing coordinates
     assert len(discounts) == 0
 
 
-@pytest.mark.asyncio
-async def test_parse_discount_missing_end_time(httpx_mock, test_location: Location):
+@pytest.mark.asyncio(loop_scope="module")
+async def test_parse_discount_missing_end_time(repo, httpx_mock, test_location: Location):
     """Test that missing endTime defaults to 3 days from now."""
     response = [
         {
@@ -387,14 +532,9 @@ async def test_parse_discount_missing_end_time(httpx_mock, test_location: Locati
         }
     ]
 
-    httpx_mock.add_response(
-        url="https://api.sallinggroup.com/v1/food-waste/?geo=55.6761%2C12.5683&radius=5.0",
-        json=response,
-        status_code=200,
-    )
+    _mock_salling(httpx_mock, json=response)
 
-    async with SallingDiscountRepository(api_key="test_key") as repo:
-        discounts = await repo.fetch_discounts(test_location, radius_km=5.0)
+    discounts = await repo.fetch_discounts(test_location, radius_km=5.0)
 
     assert len(discounts) == 1
     # Should default to today + 3 days
@@ -11,13 +11,18 @@ Tests cover:
 Requirements: All requirements
 """
 
-import unittest
+import os
+import re
 from datetime import date, timedelta
 
 import pytest
 
 from agents.discount_optimizer.discount_matcher import DiscountMatcher
-from agents.discount_optimizer.input_validator import InputValidator, ValidationError
+from agents.discount_optimizer.input_validator import (
+    InputValidator,
+    ValidationError,
+    _parse_timeframe_cached,
+)
 from agents.discount_optimizer.meal_suggester import MealSuggester
 from agents.discount_optimizer.models import (
     DiscountItem,
@@ -30,537 +35,622 @@ from agents.discount_optimizer.output_formatter import OutputFormatter
 from agents.discount_optimizer.savings_calculator import SavingsCalculator
 
 
-class TestInputValidator(unittest.TestCase):
-    """Test InputValidator component."""
+# Fixture dates are fixed once per module. parse_timeframe tests keep calling
+# date.today() because they compare against the validator's own clock.
+TODAY = date.today()
+YESTERDAY = TODAY - timedelta(days=1)
+TOMORROW = TODAY + timedelta(days=1)
+IN_3_DAYS = TODAY + timedelta(days=3)
+IN_5_DAYS = TODAY + timedelta(days=5)
+IN_7_DAYS = TODAY + timedelta(days=7)
 
-    def setUp(self):
-        """Set up test fixtures."""
-        self.validator = InputValidator()
+# Tokens a complete formatted recommendation must contain, matched in one pass.
+EXPECTED_RECOMMENDATION_TOKENS = frozenset(
+    {"SHOPPING", "SAVINGS", "TIPS", "Netto", "Føtex", "13", "Great job!"}
+)
+RECOMMENDATION_TOKEN_RE = re.compile(
+    "|".join(re.escape(token) for token in sorted(EXPECTED_RECOMMENDATION_TOKENS))
+)
 
-    def test_validate_location_coordinates_valid(self):
-        """Test validation of valid coordinates."""
-        # Copenhagen coordinates
-        assert self.validator.validate_location_coordinates(55.6761, 12.5683)
 
-        # Edge cases
-        assert self.validator.validate_location_coordinates(90, 180)
-        assert self.validator.validate_location_coordinates(-90, -180)
-        assert self.validator.validate_location_coordinates(0, 0)
+# ============================================================================
+# InputValidator
+# ============================================================================
 
-    def test_validate_location_coordinates_invalid(self):
-        """Test validation of invalid coordinates."""
-        # Latitude out of range
-        assert not self.validator.validate_location_coordinates(91, 12.5683)
-        assert not self.validator.validate_location_coordinates(-91, 12.5683)
 
-        # Longitude out of range
-        assert not self.validator.validate_location_coordinates(55.6761, 181)
-        assert not self.validator.validate_location_coordinates(55.6761, -181)
+@pytest.fixture(scope="module")
+def validator() -> InputValidator:
+    """Shared InputValidator; it holds no per-test state."""
+    return InputValidator()
 
-        # Both out of range
-        assert not self.validator.validate_location_coordinates(100, 200)
 
-    def test_validate_location_with_coordinates(self):
-        """Test location validation with coordinate dict."""
-        location_data = {"latitude": 55.6761, "longitude": 12.5683}
+def test_validate_location_coordinates_valid(validator):
+    """Test validation of valid coordinates."""
+    # Copenhagen coordinates
+    assert validator.validate_location_coordinates(55.6761, 12.5683)
 
-        location = self.validator._validate_location(location_data)
+    # Edge cases
+    assert validator.validate_location_coordinates(90, 180)
+    assert validator.validate_location_coordinates(-90, -180)
+    assert validator.validate_location_coordinates(0, 0)
 
-        assert isinstance(location, Location)
-        assert location.latitude == 55.6761
-        assert location.longitude == 12.5683
 
-    def test_validate_location_invalid_coordinates(self):
-        """Test location validation with invalid coordinates."""
-        location_data = {"latitude": 100, "longitude": 200}
+def test_validate_location_coordinates_invalid(validator):
+    """Test validation of invalid coordinates."""
+    # Latitude out of range
+    assert not validator.validate_location_coordinates(91, 12.5683)
+    assert not validator.validate_location_coordinates(-91, 12.5683)
 
-        with pytest.raises(ValidationError):
-            self.validator._validate_location(location_data)
+    # Longitude out of range
+    assert not validator.validate_location_coordinates(55.6761, 181)
+    assert not validator.validate_location_coordinates(55.6761, -181)
 
-    def test_validate_preferences_all_selected(self):
-        """Test preferences validation with all options selected."""
-        assert self.validator.validate_preferences(
-            maximize_savings=True, minimize_stores=True, prefer_organic=True
-        )
+    # Both out of range
+    assert not validator.validate_location_coordinates(100, 200)
 
-    def test_validate_preferences_one_selected(self):
-        """Test preferences validation with one option selected."""
-        assert self.validator.validate_preferences(
-            maximize_savings=True, minimize_stores=False, prefer_organic=False
-        )
 
-    def test_validate_preferences_none_selected(self):
-        """Test preferences validation with no options selected."""
-        assert not self.validator.validate_preferences(
-            maximize_savings=False, minimize_stores=False, prefer_organic=False
-        )
+def test_validate_location_with_coordinates(validator):
+    """Test location validation with coordinate dict."""
+    location_data = {"latitude": 55.6761, "longitude": 12.5683}
 
-    def test_parse_timeframe_this_week(self):
-        """Test parsing 'this week' timeframe."""
-        timeframe = self.validator.parse_timeframe("this week")
+    location = validator._validate_location(location_data)
 
-        assert isinstance(timeframe, Timeframe)
-        assert timeframe.start_date == date.today()
-        assert timeframe.end_date == date.today() + timedelta(days=7)
+    assert isinstance(location, Location)
+    assert location.latitude == 55.6761
+    assert location.longitude == 12.5683
 
-    def test_parse_timeframe_next_week(self):
-        """Test parsing 'next week' timeframe."""
-        timeframe = self.validator.parse_timeframe("next week")
 
-        assert isinstance(timeframe, Timeframe)
-        assert timeframe.start_date > date.today()
-        assert (timeframe.end_date - timeframe.start_date).days == 7
+def test_validate_location_invalid_coordinates(validator):
+    """Test location validation with invalid coordinates."""
+    location_data = {"latitude": 100, "longitude": 200}
 
-    def test_parse_timeframe_today(self):
-        """Test parsing 'today' timeframe."""
-        timeframe = self.validator.parse_timeframe("today")
+    with pytest.raises(ValidationError):
+        validator._validate_location(location_data)
 
-        assert timeframe.start_date == date.today()
-        assert timeframe.end_date == date.today()
 
-    def test_validate_meal_plan_valid(self):
-        """Test meal plan validation with valid list."""
-        assert self.validator.validate_meal_plan(["taco", "pasta"])
+def test_validate_preferences_all_selected(validator):
+    """Test preferences validation with all options selected."""
+    assert validator.validate_preferences(
+        maximize_savings=True, minimize_stores=True, prefer_organic=True
+    )
 
-    def test_validate_meal_plan_empty(self):
-        """Test meal plan validation with empty list."""
-        assert not self.validator.validate_meal_plan([])
 
+def test_validate_preferences_one_selected(validator):
+    """Test preferences validation with one option selected."""
+    assert validator.validate_preferences(
+        maximize_savings=True, minimize_stores=False, prefer_organic=False
+    )
 
-class TestDiscountMatcher(unittest.TestCase):
-    """Test DiscountMatcher component."""
 
-    def setUp(self):
-        """Set up test fixtures."""
-        self.matcher = DiscountMatcher(use_real_api=False)
+def test_validate_preferences_none_selected(validator):
+    """Test preferences validation with no options selected."""
+    assert not validator.validate_preferences(
+        maximize_savings=False, minimize_stores=False, prefer_organic=False
+    )
 
-        # Test locations
-        self.copenhagen_center = Location(55.6761, 12.5683)
-        self.norrebro = Location(55.6872, 12.5537)
-        self.vesterbro = Location(55.6692, 12.5515)
 
-        # Test discount items
-        self.discount1 = DiscountItem(
-            product_name="Test Product 1",
-            store_name="Test Store 1",
-            store_location=self.norrebro,
-            original_price=50.0,
-            discount_price=40.0,
-            discount_percent=20.0,
-            expiration_date=date.today() + timedelta(days=5),
-            is_organic=False,
-        )
+def test_parse_timeframe_this_week(validator):
+    """Test parsing 'this week' timeframe."""
+    timeframe = validator.parse_timeframe("this week")
 
-        self.discount2 = DiscountItem(
-            product_name="Test Product 2",
-            store_name="Test Store 2",
-            store_location=self.vesterbro,
-            original_price=30.0,
-            discount_price=20.0,
-            discount_percent=33.0,
-            expiration_date=date.today() + timedelta(days=3),
-            is_organic=True,
-        )
+    assert isinstance(timeframe, Timeframe)
+    assert timeframe.start_date == date.today()
+    assert timeframe.end_date == date.today() + timedelta(days=7)
 
-    def test_calculate_distance_same_location(self):
-        """Test distance calculation for same location."""
-        distance = self.matcher.calculate_distance(self.copenhagen_center, self.copenhagen_center)
 
-        self.assertAlmostEqual(distance, 0.0, places=2)
+def test_parse_timeframe_next_week(validator):
+    """Test parsing 'next week' timeframe."""
+    timeframe = validator.parse_timeframe("next week")
 
-    def test_calculate_distance_copenhagen_norrebro(self):
-        """Test distance calculation between Copenhagen center and Nørrebro."""
-        distance = self.matcher.calculate_distance(self.copenhagen_center, self.norrebro)
+    assert isinstance(timeframe, Timeframe)
+    assert timeframe.start_date > date.today()
+    assert (timeframe.end_date - timeframe.start_date).days == 7
 
-        # Expected distance is approximately 1.5 km
-        assert distance > 1.0
-        assert distance < 2.5
 
-    def test_calculate_distance_copenhagen_vesterbro(self):
-        """Test distance calculation between Copenhagen center and Vesterbro."""
-        distance = self.matcher.calculate_distance(self.copenhagen_center, self.vesterbro)
+def test_parse_timeframe_today(validator):
+    """Test parsing 'today' timeframe."""
+    timeframe = validator.parse_timeframe("today")
 
-        # Expected distance is approximately 1.2 km
-        assert distance > 0.5
-        assert distance < 2.0
+    assert timeframe.start_date == date.today()
+    assert timeframe.end_date == date.today()
 
-    def test_calculate_distance_symmetry(self):
-        """Test that distance calculation is symmetric."""
-        distance1 = self.matcher.calculate_distance(self.copenhagen_center, self.norrebro)
-        distance2 = self.matcher.calculate_distance(self.norrebro, self.copenhagen_center)
 
-        self.assertAlmostEqual(distance1, distance2, places=5)
+def test_parse_timeframe_returns_fresh_instances(validator):
+    """Test that memoized timeframes are not shared between callers."""
+    first = validator.parse_timeframe("this week")
+    second = validator.parse_timeframe("this week")
 
-    def test_filter_by_location_within_radius(self):
-        """Test filtering discounts within radius."""
-        discounts = [self.discount1, self.discount2]
+    assert first == second
+    assert first is not second
 
-        # Filter with 2km radius from Copenhagen center
-        filtered = self.matcher.filter_by_location(
-            discounts, self.copenhagen_center, max_distance_km=2.0
-        )
 
-        # Both stores should be within 2km
-        assert len(filtered) == 2
+def test_parse_timeframe_cache_keyed_on_date():
+    """Test that cached ranges follow the date passed in."""
+    monday = date(2025, 11, 17)
 
-    def test_filter_by_location_outside_radius(self):
-        """Test filtering discounts outside radius."""
-        discounts = [self.discount1, self.discount2]
+    assert _parse_timeframe_cached("next week", monday) == (date(2025, 11, 24), date(2025, 12, 1))
+    assert _parse_timeframe_cached("next week", monday + timedelta(days=1)) == (
+        date(2025, 11, 24),
+        date(2025, 12, 1),
+    )
+    assert _parse_timeframe_cached("tomorrow", monday) == (
+        date(2025, 11, 18),
+        date(2025, 11, 18),
+    )
 
-        # Filter with very small radius
-        filtered = self.matcher.filter_by_location(
-            discounts, self.copenhagen_center, max_distance_km=0.5
-        )
 
-        # No stores should be within 0.5km
-        assert len(filtered) == 0
+def test_validate_meal_plan_valid(validator):
+    """Test meal plan validation with valid list."""
+    assert validator.validate_meal_plan(["taco", "pasta"])
 
-    def test_filter_by_timeframe_valid(self):
-        """Test filtering discounts within timeframe."""
-        discounts = [self.discount1, self.discount2]
 
-        timeframe = Timeframe(start_date=date.today(), end_date=date.today() + timedelta(days=7))
+def test_validate_meal_plan_empty(validator):
+    """Test meal plan validation with empty list."""
+    assert not validator.validate_meal_plan([])
 
-        filtered = self.matcher.filter_by_timeframe(discounts, timeframe)
 
-        # Both discounts expire within timeframe
-        assert len(filtered) == 2
+# ============================================================================
+# DiscountMatcher
+# ============================================================================
 
-    def test_filter_by_timeframe_expired(self):
-        """Test filtering expired discounts."""
-        expired_discount = DiscountItem(
-            product_name="Expired Product",
-            store_name="Test Store",
-            store_location=self.copenhagen_center,
-            original_price=50.0,
-            discount_price=40.0,
-            discount_percent=20.0,
-            expiration_date=date.today() - timedelta(days=1),
-            is_organic=False,
-        )
 
-        timeframe = Timeframe(start_date=date.today(), end_date=date.today() + timedelta(days=7))
+COPENHAGEN_CENTER = Location(55.6761, 12.5683)
+NORREBRO = Location(55.6872, 12.5537)
+VESTERBRO = Location(55.6692, 12.5515)
+
+NORREBRO_DISCOUNT = DiscountItem(
+    product_name="Test Product 1",
+    store_name="Test Store 1",
+    store_location=NORREBRO,
+    original_price=50.0,
+    discount_price=40.0,
+    discount_percent=20.0,
+    expiration_date=IN_5_DAYS,
+    is_organic=False,
+)
 
-        filtered = self.matcher.filter_by_timeframe([expired_discount], timeframe)
+VESTERBRO_DISCOUNT = DiscountItem(
+    product_name="Test Product 2",
+    store_name="Test Store 2",
+    store_location=VESTERBRO,
+    original_price=30.0,
+    discount_price=20.0,
+    discount_percent=33.0,
+    expiration_date=IN_3_DAYS,
+    is_organic=True,
+)
 
-        # Expired discount should be filtered out
-        assert len(filtered) == 0
 
+@pytest.fixture(scope="module")
+def matcher() -> DiscountMatcher:
+    """Shared DiscountMatcher backed by mock data."""
+    return DiscountMatcher(use_real_api=False)
 
-class TestMealSuggester(unittest.TestCase):
-    """Test MealSuggester component."""
 
-    def setUp(self):
-        """Set up test fixtures."""
-        # Skip if no API key available
-        import os
+def test_calculate_distance_same_location(matcher):
+    """Test distance calculation for same location."""
+    distance = matcher.calculate_distance(COPENHAGEN_CENTER, COPENHAGEN_CENTER)
 
-        if not os.getenv("GOOGLE_API_KEY"):
-            self.skipTest("GOOGLE_API_KEY not available")
+    assert distance == pytest.approx(0.0, abs=1e-2)
 
-        self.suggester = MealSuggester()
 
-    def test_create_prompt_basic(self):
-        """Test basic prompt creation."""
-        products = ["Tortillas", "Hakket oksekød", "Ost"]
+def test_calculate_distance_copenhagen_norrebro(matcher):
+    """Test distance calculation between Copenhagen center and Nørrebro."""
+    distance = matcher.calculate_distance(COPENHAGEN_CENTER, NORREBRO)
 
-        prompt = self.suggester._create_prompt(products, user_preferences="", num_meals=3)
+    # Expected distance is approximately 1.5 km
+    assert distance > 1.0
+    assert distance < 2.5
 
-        assert "Tortillas" in prompt
-        assert "Hakket oksekød" in prompt
-        assert "Ost" in prompt
-        assert "3" in prompt
 
-    def test_create_prompt_with_preferences(self):
-        """Test prompt creation with user preferences."""
-        products = ["Pasta", "Tomater"]
-        preferences = "vegetarian meals"
+def test_calculate_distance_copenhagen_vesterbro(matcher):
+    """Test distance calculation between Copenhagen center and Vesterbro."""
+    distance = matcher.calculate_distance(COPENHAGEN_CENTER, VESTERBRO)
 
-        prompt = self.suggester._create_prompt(products, user_preferences=preferences, num_meals=2)
+    # Expected distance is approximately 1.2 km
+    assert distance > 0.5
+    assert distance < 2.0
 
-        assert "vegetarian meals" in prompt
 
-    def test_create_prompt_with_product_details(self):
-        """Test prompt creation with detailed product information."""
-        products = ["Tortillas", "Hakket oksekød"]
-        product_details = [
-            {
-                "name": "Tortillas",
-                "expiration_date": date.today() + timedelta(days=1),
-                "discount_percent": 30,
-            },
-            {
-                "name": "Hakket oksekød",
-                "expiration_date": date.today() + timedelta(days=5),
-                "discount_percent": 25,
-            },
-        ]
+def test_calculate_distance_symmetry(matcher):
+    """Test that distance calculation is symmetric."""
+    distance1 = matcher.calculate_distance(COPENHAGEN_CENTER, NORREBRO)
+    distance2 = matcher.calculate_distance(NORREBRO, COPENHAGEN_CENTER)
 
-        prompt = self.suggester._create_prompt(
-            products, user_preferences="", num_meals=2, product_details=product_details
-        )
+    assert distance1 == pytest.approx(distance2, abs=1e-5)
+
+
+def test_filter_by_location_within_radius(matcher):
+    """Test filtering discounts within radius."""
+    discounts = [NORREBRO_DISCOUNT, VESTERBRO_DISCOUNT]
+
+    # Filter with 2km radius from Copenhagen center
+    filtered = matcher.filter_by_location(discounts, COPENHAGEN_CENTER, max_distance_km=2.0)
+
+    # Both stores should be within 2km
+    assert len(filtered) == 2
+
+
+def test_filter_by_location_outside_radius(matcher):
+    """Test filtering discounts outside radius."""
+    discounts = [NORREBRO_DISCOUNT, VESTERBRO_DISCOUNT]
+
+    # Filter with very small radius
+    filtered = matcher.filter_by_location(discounts, COPENHAGEN_CENTER, max_distance_km=0.5)
+
+    # No stores should be within 0.5km
+    assert len(filtered) == 0
+
+
+def test_filter_by_location_matches_calculate_distance(matcher):
+    """Test that the radius cut agrees with calculate_distance."""
+    discounts = [NORREBRO_DISCOUNT, VESTERBRO_DISCOUNT]
+
+    # Vesterbro is ~1.3km away and Nørrebro ~1.5km
+    filtered = matcher.filter_by_location(discounts, COPENHAGEN_CENTER, max_distance_km=1.4)
+
+    assert filtered == [VESTERBRO_DISCOUNT]
+
+
+def test_filter_by_timeframe_valid(matcher):
+    """Test filtering discounts within timeframe."""
+    discounts = [NORREBRO_DISCOUNT, VESTERBRO_DISCOUNT]
+
+    timeframe = Timeframe(start_date=TODAY, end_date=IN_7_DAYS)
+
+    filtered = matcher.filter_by_timeframe(discounts, timeframe)
+
+    # Both discounts expire within timeframe
+    assert len(filtered) == 2
+
+
+def test_filter_by_timeframe_expired(matcher):
+    """Test filtering expired discounts."""
+    expired_discount = DiscountItem(
+        product_name="Expired Product",
+        store_name="Test Store",
+        store_location=COPENHAGEN_CENTER,
+        original_price=50.0,
+        discount_price=40.0,
+        discount_percent=20.0,
+        expiration_date=YESTERDAY,
+        is_organic=False,
+    )
+
+    timeframe = Timeframe(start_date=TODAY, end_date=IN_7_DAYS)
+
+    filtered = matcher.filter_by_timeframe([expired_discount], timeframe)
+
+    # Expired discount should be filtered out
+    assert len(filtered) == 0
+
+
+# ============================================================================
+# MealSuggester
+# ============================================================================
+
+
+@pytest.fixture(scope="module")
+def suggester() -> MealSuggester:
+    """Shared MealSuggester; skipped when no API key is available."""
+    if not os.getenv("GOOGLE_API_KEY"):
+        pytest.skip("GOOGLE_API_KEY not available")
+    return MealSuggester()
+
+
+def test_create_prompt_basic(suggester):
+    """Test basic prompt creation."""
+    products = ["Tortillas", "Hakket oksekød", "Ost"]
+
+    prompt = suggester._create_prompt(products, user_preferences="", num_meals=3)
+
+    assert "Tortillas" in prompt
+    assert "Hakket oksekød" in prompt
+    assert "Ost" in prompt
+    assert "3" in prompt
+
+
+def test_create_prompt_with_preferences(suggester):
+    """Test prompt creation with user preferences."""
+    products = ["Pasta", "Tomater"]
+    preferences = "vegetarian meals"
+
+    prompt = suggester._create_prompt(products, user_preferences=preferences, num_meals=2)
 
-        assert "URGENT" in prompt
-        assert "30%" in prompt
+    assert "vegetarian meals" in prompt
 
-    def test_parse_response_simple(self):
-        """Test parsing simple meal list response."""
-        response = """1. Taco Tuesday
+
+def test_create_prompt_with_product_details(suggester):
+    """Test prompt creation with detailed product information."""
+    products = ["Tortillas", "Hakket oksekød"]
+    product_details = [
+        {
+            "name": "Tortillas",
+            "expiration_date": TOMORROW,
+            "discount_percent": 30,
+        },
+        {
+            "name": "Hakket oksekød",
+            "expiration_date": IN_5_DAYS,
+            "discount_percent": 25,
+        },
+    ]
+
+    prompt = suggester._create_prompt(
+        products, user_preferences="", num_meals=2, product_details=product_details
+    )
+
+    assert "URGENT" in prompt
+    assert "30%" in prompt
+
+
+def test_parse_response_simple(suggester):
+    """Test parsing simple meal list response."""
+    response = """1. Taco Tuesday
 2. Pasta Bolognese
 3. Grøntsagssuppe"""
 
-        meals = self.suggester._parse_response(response)
+    meals = suggester._parse_response(response)
+
+    assert len(meals) == 3
+    assert "Taco Tuesday" in meals
+    assert "Pasta Bolognese" in meals
+    assert "Grøntsagssuppe" in meals
 
-        assert len(meals) == 3
-        assert "Taco Tuesday" in meals
-        assert "Pasta Bolognese" in meals
-        assert "Grøntsagssuppe" in meals
 
-    def test_parse_response_with_bullets(self):
-        """Test parsing response with bullet points."""
-        response = """• Morgenmad Burrito
+def test_parse_response_with_bullets(suggester):
+    """Test parsing response with bullet points."""
+    response = """• Morgenmad Burrito
 • Hurtig Pasta
 • Vegetar Wrap"""
 
-        meals = self.suggester._parse_response(response)
+    meals = suggester._parse_response(response)
 
-        assert len(meals) == 3
-        assert "Morgenmad Burrito" in meals
+    assert len(meals) == 3
+    assert "Morgenmad Burrito" in meals
 
-    def test_parse_response_mixed_format(self):
-        """Test parsing response with mixed formatting."""
-        response = """1. Taco
+
+def test_parse_response_mixed_format(suggester):
+    """Test parsing response with mixed formatting."""
+    response = """1. Taco
 - Pasta
 * Suppe"""
 
-        meals = self.suggester._parse_response(response)
+    meals = suggester._parse_response(response)
 
-        assert len(meals) == 3
+    assert len(meals) == 3
 
-    def test_fallback_suggestions(self):
-        """Test fallback meal suggestions."""
-        products = ["tortillas", "hakket oksekød", "pasta"]
 
-        meals = self.suggester._fallback_suggestions(products, num_meals=3)
+def test_fallback_suggestions(suggester):
+    """Test fallback meal suggestions."""
+    products = ["tortillas", "hakket oksekød", "pasta"]
 
-        assert len(meals) == 3
-        assert isinstance(meals[0], str)
+    meals = suggester._fallback_suggestions(products, num_meals=3)
 
+    assert len(meals) == 3
+    assert isinstance(meals[0], str)
 
-class TestSavingsCalculator(unittest.TestCase):
-    """Test SavingsCalculator component."""
 
-    def setUp(self):
-        """Set up test fixtures."""
-        self.calculator = SavingsCalculator()
+# ============================================================================
+# SavingsCalculator
+# ============================================================================
 
-        self.purchase1 = Purchase(
-            product_name="Product 1",
-            store_name="Store 1",
-            purchase_day=date.today(),
-            price=40.0,
-            savings=10.0,
-            meal_association="Taco",
-        )
 
-        self.purchase2 = Purchase(
-            product_name="Product 2",
-            store_name="Store 2",
-            purchase_day=date.today(),
-            price=20.0,
-            savings=5.0,
-            meal_association="Pasta",
-        )
+TACO_PURCHASE = Purchase(
+    product_name="Product 1",
+    store_name="Store 1",
+    purchase_day=TODAY,
+    price=40.0,
+    savings=10.0,
+    meal_association="Taco",
+)
 
-    def test_calculate_monetary_savings_single(self):
-        """Test monetary savings calculation with single purchase."""
-        savings = self.calculator.calculate_monetary_savings([self.purchase1])
+PASTA_PURCHASE = Purchase(
+    product_name="Product 2",
+    store_name="Store 2",
+    purchase_day=TODAY,
+    price=20.0,
+    savings=5.0,
+    meal_association="Pasta",
+)
 
-        assert savings == 10.0
 
-    def test_calculate_monetary_savings_multiple(self):
-        """Test monetary savings calculation with multiple purchases."""
-        savings = self.calculator.calculate_monetary_savings([self.purchase1, self.purchase2])
+@pytest.fixture(scope="module")
+def calculator() -> SavingsCalculator:
+    """Shared SavingsCalculator; it holds no per-test state."""
+    return SavingsCalculator()
 
-        assert savings == 15.0
 
-    def test_calculate_monetary_savings_empty(self):
-        """Test monetary savings calculation with no purchases."""
-        savings = self.calculator.calculate_monetary_savings([])
+def test_calculate_monetary_savings_single(calculator):
+    """Test monetary savings calculation with single purchase."""
+    savings = calculator.calculate_monetary_savings([TACO_PURCHASE])
 
-        assert savings == 0.0
+    assert savings == 10.0
 
-    def test_calculate_time_savings_returns_float(self):
-        """Test that time savings calculation returns a float."""
-        copenhagen = Location(55.6761, 12.5683)
 
-        time_savings = self.calculator.calculate_time_savings([self.purchase1], copenhagen)
+def test_calculate_monetary_savings_multiple(calculator):
+    """Test monetary savings calculation with multiple purchases."""
+    savings = calculator.calculate_monetary_savings([TACO_PURCHASE, PASTA_PURCHASE])
 
-        assert isinstance(time_savings, float)
+    assert savings == 15.0
 
 
-class TestOutputFormatter(unittest.TestCase):
-    """Test OutputFormatter component."""
+def test_calculate_monetary_savings_empty(calculator):
+    """Test monetary savings calculation with no purchases."""
+    savings = calculator.calculate_monetary_savings([])
 
-    def setUp(self):
-        """Set up test fixtures."""
-        self.formatter = OutputFormatter()
+    assert savings == 0.0
 
-        today = date.today()
-        tomorrow = today + timedelta(days=1)
 
-        self.purchase1 = Purchase(
-            product_name="Tortillas",
-            store_name="Netto",
-            purchase_day=today,
-            price=18.0,
-            savings=7.0,
-            meal_association="Taco",
-        )
+def test_calculate_time_savings_returns_float(calculator):
+    """Test that time savings calculation returns a float."""
+    copenhagen = Location(55.6761, 12.5683)
 
-        self.purchase2 = Purchase(
-            product_name="Pasta",
-            store_name="Føtex",
-            purchase_day=today,
-            price=12.0,
-            savings=6.0,
-            meal_association="Pasta",
-        )
+    time_savings = calculator.calculate_time_savings([TACO_PURCHASE], copenhagen)
 
-        self.purchase3 = Purchase(
-            product_name="Ost",
-            store_name="Netto",
-            purchase_day=tomorrow,
-            price=35.0,
-            savings=10.0,
-            meal_association="Taco",
-        )
+    assert isinstance(time_savings, float)
+
+
+# ============================================================================
+# OutputFormatter
+# ============================================================================
 
-    def test_group_by_store_and_day(self):
-        """Test grouping purchases by store and day."""
-        purchases = [self.purchase1, self.purchase2, self.purchase3]
 
-        grouped = self.formatter.group_by_store_and_day(purchases)
+NETTO_TORTILLAS = Purchase(
+    product_name="Tortillas",
+    store_name="Netto",
+    purchase_day=TODAY,
+    price=18.0,
+    savings=7.0,
+    meal_association="Taco",
+)
+
+FOTEX_PASTA = Purchase(
+    product_name="Pasta",
+    store_name="Føtex",
+    purchase_day=TODAY,
+    price=12.0,
+    savings=6.0,
+    meal_association="Pasta",
+)
+
+NETTO_OST = Purchase(
+    product_name="Ost",
+    store_name="Netto",
+    purchase_day=TOMORROW,
+    price=35.0,
+    savings=10.0,
+    meal_association="Taco",
+)
+
 
-        # Should have 2 stores
-        assert len(grouped) == 2
-        assert "Netto" in grouped
-        assert "Føtex" in grouped
+@pytest.fixture(scope="module")
+def formatter() -> OutputFormatter:
+    """Shared OutputFormatter; it holds no per-test state."""
+    return OutputFormatter()
 
-        # Netto should have 2 days
-        assert len(grouped["Netto"]) == 2
 
-        # Føtex should have 1 day
-        assert len(grouped["Føtex"]) == 1
+def test_group_by_store_and_day(formatter):
+    """Test grouping purchases by store and day."""
+    purchases = [NETTO_TORTILLAS, FOTEX_PASTA, NETTO_OST]
 
-    def test_generate_tips_time_sensitive(self):
-        """Test tip generation for time-sensitive products."""
-        today = date.today()
+    grouped = formatter.group_by_store_and_day(purchases)
 
-        urgent_purchase = Purchase(
-            product_name="Salat",
-            store_name="Netto",
-            purchase_day=today,
-            price=15.0,
+    # Should have 2 stores
+    assert len(grouped) == 2
+    assert "Netto" in grouped
+    assert "Føtex" in grouped
+
+    # Netto should have 2 days
+    assert len(grouped["Netto"]) == 2
+
+    # Føtex should have 1 day
+    assert len(grouped["Føtex"]) == 1
+
+
+def test_generate_tips_time_sensitive(formatter):
+    """Test tip generation for time-sensitive products."""
+    urgent_purchase = Purchase(
+        product_name="Salat",
+        store_name="Netto",
+        purchase_day=TODAY,
+        price=15.0,
+        savings=5.0,
+        meal_association="Taco",
+    )
+
+    tips = formatter.generate_tips([urgent_purchase])
+
+    assert len(tips) > 0
+    assert len(tips) <= 3
+
+
+def test_generate_tips_organic(formatter):
+    """Test tip generation for organic products."""
+    purchase = Purchase(
+        product_name="Økologisk ost",
+        store_name="Føtex",
+        purchase_day=IN_5_DAYS,
+        price=42.0,
+        savings=13.0,
+        meal_association="Taco",
+    )
+
+    tips = formatter.generate_tips([purchase])
+
+    # Should generate tip for organic product with good savings
+    assert len(tips) > 0
+
+
+def test_generate_tips_max_three(formatter):
+    """Test that tips are limited to maximum 3."""
+    purchases = [
+        Purchase(
+            product_name=f"Product {i}",
+            store_name=f"Store {i}",
+            purchase_day=TODAY,
+            price=20.0,
             savings=5.0,
-            meal_association="Taco",
+            meal_association="Meal",
         )
+        for i in range(10)
+    ]
 
-        tips = self.formatter.generate_tips([urgent_purchase])
+    tips = formatter.generate_tips(purchases)
 
-        assert len(tips) > 0
-        assert len(tips) <= 3
+    assert len(tips) <= 3
 
-    def test_generate_tips_organic(self):
-        """Test tip generation for organic products."""
-        purchase = Purchase(
-            product_name="Økologisk ost",
-            store_name="Føtex",
-            purchase_day=date.today() + timedelta(days=5),
-            price=42.0,
-            savings=13.0,
-            meal_association="Taco",
-        )
 
-        tips = self.formatter.generate_tips([purchase])
-
-        # Should generate tip for organic product with good savings
-        assert len(tips) > 0
-
-    def test_generate_tips_max_three(self):
-        """Test that tips are limited to maximum 3."""
-        purchases = [
-            Purchase(
-                product_name=f"Product {i}",
-                store_name=f"Store {i}",
-                purchase_day=date.today(),
-                price=20.0,
-                savings=5.0,
-                meal_association="Meal",
-            )
-            for i in range(10)
-        ]
-
-        tips = self.formatter.generate_tips(purchases)
-
-        assert len(tips) <= 3
-
-    def test_generate_motivation_high_savings(self):
-        """Test motivation message for high savings."""
-        motivation = self.formatter.generate_motivation(total_savings=150.0, time_savings=1.5)
-
-        assert "150" in motivation
-        assert "kr" in motivation
-        assert isinstance(motivation, str)
-        assert len(motivation) > 10
-
-    def test_generate_motivation_low_savings(self):
-        """Test motivation message for low savings."""
-        motivation = self.formatter.generate_motivation(total_savings=30.0, time_savings=0.2)
-
-        assert "30" in motivation
-        assert isinstance(motivation, str)
-
-    def test_format_recommendation_complete(self):
-        """Test complete recommendation formatting."""
-        recommendation = ShoppingRecommendation(
-            purchases=[self.purchase1, self.purchase2],
-            total_savings=13.0,
-            time_savings=0.5,
-            tips=["Tip 1", "Tip 2"],
-            motivation_message="Great job!",
-        )
+def test_generate_motivation_high_savings(formatter):
+    """Test motivation message for high savings."""
+    motivation = formatter.generate_motivation(total_savings=150.0, time_savings=1.5)
 
-        output = self.formatter.format_recommendation(recommendation)
-
-        # Check for key sections
-        assert "SHOPPING" in output
-        assert "SAVINGS" in output
-        assert "TIPS" in output
-        assert "Netto" in output
-        assert "Føtex" in output
-        assert "13" in output
-        assert "Great job!" in output
-
-    def test_format_recommendation_structure(self):
-        """Test that formatted output has proper structure."""
-        recommendation = ShoppingRecommendation(
-            purchases=[self.purchase1],
-            total_savings=7.0,
-            time_savings=0.3,
-            tips=["Tip 1"],
-            motivation_message="Well done!",
-        )
+    assert "150" in motivation
+    assert "kr" in motivation
+    assert isinstance(motivation, str)
+    assert len(motivation) > 10
+
+
+def test_generate_motivation_low_savings(formatter):
+    """Test motivation message for low savings."""
+    motivation = formatter.generate_motivation(total_savings=30.0, time_savings=0.2)
+
+    assert "30" in motivation
+    assert isinstance(motivation, str)
+
+
+def test_format_recommendation_complete(formatter):
+    """Test complete recommendation formatting."""
+    recommendation = ShoppingRecommendation(
+        purchases=[NETTO_TORTILLAS, FOTEX_PASTA],
+        total_savings=13.0,
+        time_savings=0.5,
+        tips=["Tip 1", "Tip 2"],
+        motivation_message="Great job!",
+    )
+
+    output = formatter.format_recommendation(recommendation)
+
+    # Check for key sections
+    found = set(RECOMMENDATION_TOKEN_RE.findall(output))
+    assert EXPECTED_RECOMMENDATION_TOKENS - found == set()
 
-        output = self.formatter.format_recommendation(recommendation)
 
-        # Should have multiple lines
-        lines = output.split("\n")
-        assert len(lines) > 10
+def test_format_recommendation_structure(formatter):
+    """Test that formatted output has proper structure."""
+    recommendation = ShoppingRecommendation(
+        purchases=[NETTO_TORTILLAS],
+        total_savings=7.0,
+        time_savings=0.3,
+        tips=["Tip 1"],
+        motivation_message="Well done!",
+    )
 
-        # Should have separators
-        assert "=" * 60 in output
+    output = formatter.format_recommendation(recommendation)
 
+    # Should have multiple lines
+    lines = output.split("\n")
+    assert len(lines) > 10
 
-if __name__ == "__main__":
-    unittest.main()
+    # Should have separators
+    assert "=" * 60 in output
@@ -1,70 +1,342 @@
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import re
 import subprocess
 import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+from importlib import metadata
 from pathlib import Path
 
-def check_step(name, command):
-    print(f"\n🔍 Checking {name}...")
-    try:
-        # Kör kommandot och fånga output
-        result = subprocess.run(command, shell=True, capture_output=True, text=True)
-        if result.returncode == 0:
-            print(f"✅ {name}: PASS")
-            return True
+
+# mypy ships a thread-safe API, so the type check can run inside this
+# interpreter instead of paying for a second cold start
+try:
+    from mypy import api as mypy_api
+    from mypy import version as mypy_version
+
+    MYPY_AVAILABLE = True
+except ImportError:
+    MYPY_AVAILABLE = False
+    mypy_api = None
+    mypy_version = None
+
+# Spawn checks with posix_spawn where the platform has it (not on Windows)
+POSIX_SPAWN_AVAILABLE = hasattr(os, "posix_spawnp")
+
+# Bytes of a failing check's stderr shown in the report
+ERROR_OUTPUT_LIMIT = 500
+
+# Directories find_missing lists serially; a pool costs more than it saves below this
+PARALLEL_LISTING_THRESHOLD = 4
+
+# Fingerprints of checks that passed, so unchanged inputs skip the rerun.
+# Delete the file to force every check to run again.
+CACHE_PATH = Path(".verify_cache.json")
+
+# Upgrading the interpreter or a checker can change a verdict on unchanged inputs,
+# so their versions are part of every fingerprint. pytest is only run in a child
+# process, so its version is read from the installed metadata instead of importing it.
+try:
+    PYTEST_VERSION = metadata.version("pytest")
+except metadata.PackageNotFoundError:
+    PYTEST_VERSION = ""
+MYPY_VERSION = mypy_version.__version__ if MYPY_AVAILABLE else ""
+TOOL_VERSIONS = (sys.version, MYPY_VERSION, PYTEST_VERSION)
+
+# Settings validation and test collection depend on these, so a verdict recorded
+# with them set must not be replayed without them. Only presence is hashed: the
+# cache file should not carry anything derived from a secret.
+FINGERPRINT_ENV = ("GOOGLE_API_KEY", "SALLING_GROUP_API_KEY", "GOOGLE_MAPS_API_KEY")
+
+# A blocking HTTP client import; compiled once and applied to every repository
+BLOCKING_IMPORT = re.compile(rb"^\s*(?:import|from)\s+requests\b", re.MULTILINE)
+
+
+def run_command(command):
+    """Run an argv list in a child process and return (exit code, head of stderr)."""
+    # Only the head of stderr is ever shown, so stdout is discarded and stderr
+    # goes to an anonymous temp file: the child can never block on a full pipe
+    # and nothing beyond the head is read back
+    with tempfile.TemporaryFile() as stderr:
+        if POSIX_SPAWN_AVAILABLE:
+            # Skips Popen's Python-side setup; the C library can vfork
+            pid = os.posix_spawnp(
+                command[0],
+                command,
+                os.environ,
+                file_actions=[
+                    (os.POSIX_SPAWN_OPEN, 1, os.devnull, os.O_WRONLY, 0),
+                    (os.POSIX_SPAWN_DUP2, stderr.fileno(), 2),
+                ],
+            )
+            returncode = os.waitstatus_to_exitcode(os.waitpid(pid, 0)[1])
         else:
-            print(f"❌ {name}: FAIL")
-            # Visa bara de första 500 tecknen av felet för att inte spamma
-            print(f"Error output:\n{result.stderr[:500]}...") 
-            return False
+            returncode = subprocess.run(
+                command, stdout=subprocess.DEVNULL, stderr=stderr, check=False
+            ).returncode
+        stderr.seek(0)
+        error_head = stderr.read(ERROR_OUTPUT_LIMIT)
+    return returncode, error_head.decode("utf-8", "replace")
+
+
+def run_mypy(args):
+    """Run mypy in this interpreter, or in a child process if it isn't importable."""
+    if not MYPY_AVAILABLE:
+        return run_command(["python3", "-m", "mypy", *args])
+    report, errors, returncode = mypy_api.run(args)
+    # Type errors go to mypy's normal report; stderr only carries crashes
+    return returncode, (errors or report)[:ERROR_OUTPUT_LIMIT]
+
+
+# Independent checks, run side by side, as (name, runner, args, input paths).
+# pytest stays in a child process: it captures the process-wide stdout/stderr
+# file descriptors and imports the code under test, neither of which can share
+# an interpreter with mypy.
+CHECKS = [
+    # Detta bevisar att din kod är typsäker
+    (
+        "Type Safety (mypy)",
+        run_mypy,
+        ["agents/discount_optimizer/domain/", "--strict"],
+        ["agents/discount_optimizer/domain", "mypy.ini", "pyproject.toml", "requirements.txt"],
+    ),
+    # Vi kör en snabb testomgång på kärnlogiken (services)
+    (
+        "Core Logic Tests",
+        run_command,
+        [
+            "python3",
+            "-m",
+            "pytest",
+            "tests/services/",
+            "-q",
+            "--no-header",
+            "-p",
+            "no:cacheprovider",
+        ],
+        [
+            "tests/services",
+            "tests/conftest.py",
+            "agents/discount_optimizer",
+            "pyproject.toml",
+            "requirements.txt",
+            ".env",
+        ],
+    ),
+]
+
+
+def check_step(name, run, args):
+    """Run one check and return (passed, report lines) so callers control output order."""
+    lines = [f"\n🔍 Checking {name}..."]
+    try:
+        returncode, error_head = run(args)
+        if returncode == 0:
+            lines.append(f"✅ {name}: PASS")
+            return True, lines
+        lines.append(f"❌ {name}: FAIL")
+        # Visa bara de första 500 tecknen av felet för att inte spamma
+        lines.append(f"Error output:\n{error_head}...")
+        return False, lines
     except Exception as e:
-        print(f"❌ {name}: CRASH ({e})")
-        return False
+        lines.append(f"❌ {name}: CRASH ({e})")
+        return False, lines
+
+
+def iter_stats(path):
+    """Yield (path, mtime_ns, size) for a file, or for every file under a directory."""
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name != "__pycache__":
+                        yield from iter_stats(entry.path)
+                else:
+                    stat = entry.stat(follow_symlinks=False)
+                    yield entry.path, stat.st_mtime_ns, stat.st_size
+    except NotADirectoryError:
+        stat = Path(path).stat()
+        yield path, stat.st_mtime_ns, stat.st_size
+    except FileNotFoundError:
+        yield path, -1, -1
+
+
+def fingerprint(args, inputs):
+    """
+    Hash what a check's verdict depends on.
+
+    That is the tool versions, the check's arguments, which API keys are set,
+    and the path, mtime and size of its inputs.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update("\0".join((*TOOL_VERSIONS, *args)).encode())
+    for name in FINGERPRINT_ENV:
+        digest.update(f"\0{name}={bool(os.environ.get(name))}".encode())
+    for path, mtime_ns, size in sorted(stat for item in inputs for stat in iter_stats(item)):
+        digest.update(f"\0{path}\0{mtime_ns}\0{size}".encode())
+    return digest.hexdigest()
+
+
+def load_cache():
+    try:
+        return json.loads(CACHE_PATH.read_bytes())
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_cache(verdicts):
+    # A read-only checkout just means the next run starts cold
+    with contextlib.suppress(OSError):
+        CACHE_PATH.write_text(json.dumps(verdicts, indent=2, sort_keys=True))
+
+
+@cache
+def list_names(directory):
+    """
+    Return the entry names in directory, or an empty set if it doesn't exist.
+
+    Memoized per process so every probe of a directory shares one listing; the
+    checks never create or delete files.
+    """
+    try:
+        with os.scandir(directory) as entries:
+            return frozenset(entry.name for entry in entries)
+    except OSError:
+        return frozenset()
+
+
+def find_missing(paths):
+    """
+    Return the paths that don't exist, listing each parent directory only once.
+
+    Top-level names are checked against a single listing of the current
+    directory first. If any of those are missing this is probably not the
+    repository root, so they are returned without listing nested directories.
+    """
+    root = Path()
+    listings = {root: list_names(root)}
+    missing = [
+        path
+        for path in paths
+        if Path(path).parent == root and Path(path).name not in listings[root]
+    ]
+    if missing:
+        return missing
+
+    parents = list({Path(path).parent for path in paths} - {root})
+    if len(parents) > PARALLEL_LISTING_THRESHOLD:
+        # The GIL is released while listing, so slow filesystems (NFS, Docker
+        # bind mounts) overlap their latency across threads
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            listings.update(zip(parents, executor.map(list_names, parents), strict=True))
+    else:
+        listings.update((parent, list_names(parent)) for parent in parents)
+    return [path for path in paths if Path(path).name not in listings[Path(path).parent]]
+
+
+def run_health_check(emit):
+    """Run every check, passing each report line to emit."""
+    emit("=== SHOPPING OPTIMIZER HEALTH CHECK ===")
 
-def main():
-    print("=== SHOPPING OPTIMIZER HEALTH CHECK ===")
-    
     # 1. Check Project Structure
     required_files = [
-        "app.py", 
+        "app.py",
         "agents/discount_optimizer/factory.py",
         "agents/discount_optimizer/domain/protocols.py",
         "docker-compose.yml",
         # ".github/workflows/ci.yml" # Commented out as I didn't see this in the file list earlier, better to be safe or check if it exists
     ]
-    # Let's check if .github exists first
-    if Path(".github/workflows/ci.yml").exists():
-         required_files.append(".github/workflows/ci.yml")
+    # Let's check if .github exists first. The listing is shared with
+    # find_missing, so this costs no extra filesystem call.
+    if "ci.yml" in list_names(Path(".github/workflows")):
+        required_files.append(".github/workflows/ci.yml")
 
-    missing = [f for f in required_files if not Path(f).exists()]
+    missing = find_missing(required_files)
     if missing:
-        print(f"❌ Structure: Missing critical files: {missing}")
+        emit(f"❌ Structure: Missing critical files: {missing}")
     else:
-        print("✅ Structure: All critical files present")
+        emit("✅ Structure: All critical files present")
 
-    # 2. Run Type Check (Strict)
-    # Detta bevisar att din kod är typsäker
-    # Adjusting path to be relative to where we run it
-    check_step("Type Safety (mypy)", "python3 -m mypy agents/discount_optimizer/domain/ --strict")
+    # 2-3. Run Type Check (Strict) and Tests (Logic) concurrently, reporting in
+    # CHECKS order regardless of which finishes first. Each check is CPU-bound,
+    # so don't start more at once than there are cores. Checks whose inputs are
+    # unchanged since they last passed are not rerun.
+    verdicts = load_cache()
+    keys = {name: fingerprint(args, inputs) for name, _, args, inputs in CHECKS}
+    max_workers = min(len(CHECKS), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            name: executor.submit(check_step, name, run, args)
+            for name, run, args, _ in CHECKS
+            if verdicts.get(name) != keys[name]
+        }
+        for name, *_ in CHECKS:
+            if name not in futures:
+                emit(f"\n🔍 Checking {name}...\n✅ {name}: PASS (unchanged since last run)")
+                continue
+            passed, lines = futures[name].result()
+            emit(*lines)
+            if passed:
+                verdicts[name] = keys[name]
+            else:
+                verdicts.pop(name, None)
+    save_cache(verdicts)
 
-    # 3. Run Tests (Logic)
-    # Vi kör en snabb testomgång på kärnlogiken (services)
-    check_step("Core Logic Tests", "python3 -m pytest tests/services/ -v")
-    
-    # 4. Check Async/Await Usage (Grep)
+    # 4. Check Async/Await Usage
     # Vi vill INTE se 'import requests' i våra async repositories (det blockerar)
-    # Om grep INTE hittar något, är det bra (exit code 1), så vi inverterar kollen
-    print("\n🔍 Checking for blocking calls in Async Repo...")
-    repo_path = "agents/discount_optimizer/infrastructure/google_maps_repository.py"
-    if Path(repo_path).exists():
-        result = subprocess.run(f"grep 'import requests' {repo_path}", shell=True, capture_output=True)
-        if result.returncode != 0:
-            print("✅ No Blocking Calls: PASS")
+    emit("\n🔍 Checking for blocking calls in Async Repos...")
+    repo_paths = sorted(Path("agents").glob("*/infrastructure/*_repository.py"))
+    if repo_paths:
+        blocking = []
+        for path in repo_paths:
+            # Open directly rather than probing first; glob also yields dangling
+            # symlinks, and a file can vanish between the glob and the read
+            try:
+                source = path.read_bytes()
+            except FileNotFoundError:
+                emit(f"⚠️ Skipping blocking call check: {path} not found")
+                continue
+            if BLOCKING_IMPORT.search(source):
+                blocking.append(str(path))
+        if not blocking:
+            emit("✅ No Blocking Calls: PASS")
         else:
-            print("❌ Blocking Calls Found: FAIL (Found 'import requests' in async repo)")
+            emit(f"❌ Blocking Calls Found: FAIL (Found 'import requests' in {blocking})")
     else:
-        print(f"⚠️ Skipping blocking call check: {repo_path} not found")
+        emit("⚠️ Skipping blocking call check: no infrastructure repositories found")
+
+    emit("\n=== SUMMARY ===")
+    emit("Om allt ovan är grönt har du ett stabilt, enterprise-grade system.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shopping Optimizer health check")
+    parser.add_argument(
+        "--verbose", action="store_true", help="print each result as soon as it is known"
+    )
+    args = parser.parse_args()
+
+    # Collect the report and write it once at the end instead of taking the
+    # stdout lock and flushing for every line; --verbose streams progress
+    report = []
+
+    def emit(*lines):
+        if args.verbose:
+            print(*lines, sep="\n", flush=True)
+        else:
+            report.extend(lines)
+
+    try:
+        run_health_check(emit)
+    finally:
+        if report:
+            sys.stdout.write("\n".join(report) + "\n")
 
-    print("\n=== SUMMARY ===")
-    print("Om allt ovan är grönt har du ett stabilt, enterprise-grade system.")
 
 if __name__ == "__main__":
     main()